@@ -1,8 +1,13 @@
+import os
+import sys
 import serial
-import time
 import streamlit as st
 
-SERIAL_PORT = 'COM13'
+# Permite importar el paquete ts2000 desde la raíz del proyecto
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ts2000.cat import CatTransport, CatError
+
+SERIAL_PORT = os.environ.get('TS2000_PORT', 'COM13')
 BAUDRATE = 9600
 
 MODES = {
@@ -21,15 +26,15 @@ def init_serial():
         )
         ser.dtr = False
         ser.rts = False
-        return ser
+        return CatTransport(ser)
     except Exception as e:
         st.error(f"No se pudo abrir el puerto {SERIAL_PORT}: {e}")
         return None
 
 def main():
     st.set_page_config(page_title="Control rápido VFO TS-2000", layout="centered")
-    ser = init_serial()
-    if not ser:
+    cat = init_serial()
+    if not cat:
         return
 
     st.markdown("<div style='font-size:24px;font-weight:bold;margin-bottom:24px;'>Control directo de VFOs Kenwood TS-2000</div>", unsafe_allow_html=True)
@@ -46,16 +51,12 @@ def main():
                 try:
                     freq_hz = int(float(freq_a_set) * 1000)
                     freq_str = str(freq_hz).zfill(11)
-                    ser.write(b"FR0;")
-                    time.sleep(0.18)
-                    ser.read_all()
-                    ser.write(f"FA{freq_str};".encode())
-                    time.sleep(0.18)
-                    ser.read_all()
-                    ser.write(f"MD{MODES_REV[mode_a_set]};".encode())
-                    time.sleep(0.18)
-                    ser.read_all()
+                    cat.set("FR0;")
+                    cat.set(f"FA{freq_str};")
+                    cat.set(f"MD{MODES_REV[mode_a_set]};")
                     st.success("✅ Comandos enviados a VFO A.")
+                except CatError as e:
+                    st.error(f"❌ {e}")
                 except Exception as e:
                     st.error("❌ Ingresa una frecuencia válida en kHz")
 
@@ -70,19 +71,13 @@ def main():
                 try:
                     freq_hz = int(float(freq_b_set) * 1000)
                     freq_str = str(freq_hz).zfill(11)
-                    ser.write(b"FR1;")
-                    time.sleep(0.18)
-                    ser.read_all()
-                    ser.write(f"FA{freq_str};".encode())
-                    time.sleep(0.18)
-                    ser.read_all()
-                    ser.write(f"MD{MODES_REV[mode_b_set]};".encode())
-                    time.sleep(0.18)
-                    ser.read_all()
-                    ser.write(b"FR0;")
-                    time.sleep(0.18)
-                    ser.read_all()
+                    cat.set("FR1;")
+                    cat.set(f"FA{freq_str};")
+                    cat.set(f"MD{MODES_REV[mode_b_set]};")
+                    cat.set("FR0;")
                     st.success("✅ Comandos enviados a VFO B.")
+                except CatError as e:
+                    st.error(f"❌ {e}")
                 except Exception as e:
                     st.error("❌ Ingresa una frecuencia válida en kHz")
 
@@ -1,8 +1,13 @@
+import os
+import sys
 import serial
-import time
 import streamlit as st
 
-SERIAL_PORT = 'COM13'
+# Permite importar el paquete ts2000 desde la raíz del proyecto
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ts2000.cat import CatTransport
+
+SERIAL_PORT = os.environ.get('TS2000_PORT', 'COM13')
 BAUDRATE = 9600
 
 MODES = {
@@ -29,21 +34,19 @@ def init_serial():
         )
         ser.dtr = False
         ser.rts = False
-        return ser
+        return CatTransport(ser)
     except Exception as e:
         st.error(f"No se pudo abrir el puerto {SERIAL_PORT}: {e}")
         return None
 
-def send_command(ser, command):
-    if not command.endswith(';'):
-        command += ';'
-    ser.write(command.encode())
-    time.sleep(0.3)
-    response = ser.read_all().decode().strip()
-    return response or "[Sin respuesta]"
+def send_command(cat, command, timeout=None):
+    # Las consultas regresan en cuanto llega el ';'; los comandos de escritura
+    # solo esperan un posible '?;' (timeout=None)
+    frame = cat.command(command, timeout=timeout)
+    return f"{frame};" if frame is not None else "[Sin respuesta]"
 
-def get_freq_mode_rs(ser):
-    raw = send_command(ser, 'FA;')
+def get_freq_mode_rs(cat):
+    raw = send_command(cat, 'FA;', cat.timeout)
     freq = "Desconocida"
     for part in raw.split(';'):
         if part.startswith("FA"):
@@ -54,11 +57,11 @@ def get_freq_mode_rs(ser):
             except ValueError:
                 pass
 
-    mode_raw = send_command(ser, 'MD;')
+    mode_raw = send_command(cat, 'MD;', cat.timeout)
     mode_code = mode_raw.replace("MD", "").replace(";", "")
     mode = MODES.get(mode_code, "Desconocido")
 
-    rm_raw = send_command(ser, 'RM;')
+    rm_raw = send_command(cat, 'RM;', cat.timeout)
     rs_val = 0
     for part in rm_raw.split(';'):
         if part.startswith("RM"):
@@ -75,38 +78,38 @@ def get_freq_mode_rs(ser):
 
     return freq, mode, sm_display
 
-def set_frequency(ser, freq_khz):
+def set_frequency(cat, freq_khz):
     try:
         freq_hz = int(float(freq_khz) * 1000)
         freq_str = str(freq_hz).zfill(11)
-        return send_command(ser, f'FA{freq_str};')
+        return send_command(cat, f'FA{freq_str};')
     except ValueError:
         return "Frecuencia inválida"
 
-def set_mode(ser, mode_code):
-    return send_command(ser, f'MD{mode_code};')
+def set_mode(cat, mode_code):
+    return send_command(cat, f'MD{mode_code};')
 
-def ptt_on(ser):
-    return send_command(ser, 'TX;')
+def ptt_on(cat):
+    return send_command(cat, 'TX;')
 
-def ptt_off(ser):
-    return send_command(ser, 'RX;')
+def ptt_off(cat):
+    return send_command(cat, 'RX;')
 
-def read_menu_61A(ser):
-    return send_command(ser, 'EX06101000;')
+def read_menu_61A(cat):
+    return send_command(cat, 'EX06101000;', cat.timeout)
 
-def write_menu_61A(ser, value):
-    return send_command(ser, f'EX06101001{value};')
+def write_menu_61A(cat, value):
+    return send_command(cat, f'EX06101001{value};')
 
 def main():
     st.title("Control Kenwood TS-2000 vía CAT")
-    ser = init_serial()
-    if not ser:
+    cat = init_serial()
+    if not cat:
         return
 
     st.subheader("Lectura del radio")
     if st.button("📡 Leer frecuencia, modo y señal"):
-        freq, mode, sm = get_freq_mode_rs(ser)
+        freq, mode, sm = get_freq_mode_rs(cat)
         st.success(f"Frecuencia: {freq}")
         st.info(f"Modo: {mode}")
         st.warning(f"RS: {sm}")
@@ -116,7 +119,7 @@ def main():
     with col1:
         freq_input = st.text_input("Nueva frecuencia (kHz)", "146520")
         if st.button("Establecer frecuencia"):
-            result = set_frequency(ser, freq_input)
+            result = set_frequency(cat, freq_input)
             if '?' in result:
                 st.error(f"Error: {result}")
             else:
@@ -124,7 +127,7 @@ def main():
     with col2:
         mode_select = st.selectbox("Modo", list(MODES.items()), format_func=lambda x: f"{x[0]} - {x[1]}")
         if st.button("Cambiar modo"):
-            result = set_mode(ser, mode_select[0])
+            result = set_mode(cat, mode_select[0])
             if '?' in result:
                 st.error(f"Error: {result}")
             else:
@@ -134,14 +137,14 @@ def main():
     col3, col4 = st.columns(2)
     with col3:
         if st.button("🔴 Activar PTT (TX)"):
-            result = ptt_on(ser)
+            result = ptt_on(cat)
             if '?' in result:
                 st.error(result)
             else:
                 st.success("✅ Transmitiendo")
     with col4:
         if st.button("⚪ Desactivar PTT (RX)"):
-            result = ptt_off(ser)
+            result = ptt_off(cat)
             if '?' in result:
                 st.error(result)
             else:
@@ -149,14 +152,14 @@ def main():
 
     st.subheader("Menú 61A (Modo Repetidor)")
     if st.button("Leer menú 61A"):
-        result = read_menu_61A(ser)
+        result = read_menu_61A(cat)
         if '?' in result:
             st.error(f"❌ {result}")
         else:
             st.success(f"📖 Respuesta: {result}")
     menu_val = st.selectbox("Establecer valor menú 61A", [("0", "OFF"), ("1", "LOCK-ED"), ("2", "CROSS")], format_func=lambda x: f"{x[0]} - {x[1]}")
     if st.button("Guardar valor menú 61A"):
-        result = write_menu_61A(ser, menu_val[0])
+        result = write_menu_61A(cat, menu_val[0])
         if '?' in result:
             st.error(f"❌ {result}")
         else:
@@ -165,7 +168,7 @@ def main():
     st.subheader("Enviar comando CAT manual")
     cmd = st.text_input("Comando CAT", "FA;")
     if st.button("Enviar comando"):
-        result = send_command(ser, cmd)
+        result = send_command(cat, cmd, cat.timeout)
         if '?' in result or result.strip() == '' or not result.endswith(';'):
             st.error(f"⚠️ Respuesta del radio: {result}")
         else:
@@ -1,8 +1,13 @@
+import os
+import sys
 import serial
-import time
 import streamlit as st
 
-SERIAL_PORT = 'COM13'
+# Permite importar el paquete ts2000 desde la raíz del proyecto
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ts2000.cat import CatTransport
+
+SERIAL_PORT = os.environ.get('TS2000_PORT', 'COM13')
 BAUDRATE = 9600
 
 @st.cache_resource
@@ -15,30 +20,28 @@ def init_serial():
         )
         ser.dtr = False
         ser.rts = False
-        return ser
+        return CatTransport(ser)
     except Exception as e:
         st.error(f"No se pudo abrir el puerto {SERIAL_PORT}: {e}")
         return None
 
-def send_and_receive(ser, command):
+def send_and_receive(cat, command):
     try:
-        ser.reset_input_buffer()
-        ser.write(command.encode())
-        time.sleep(0.3)
-        return ser.read_all().decode().strip()
+        frame = cat.command(command, timeout=cat.timeout)
+        return f"{frame};" if frame is not None else ""
     except Exception as e:
         return f"Error: {e}"
 
 def main():
     st.title("Prueba de comandos CAT - Kenwood TS-2000")
-    ser = init_serial()
-    if not ser:
+    cat = init_serial()
+    if not cat:
         return
 
     command = st.text_input("Escribe un comando CAT (ej. FA;, IF;, MD;, MF0;, etc.):", "MD;")
 
     if st.button("Enviar comando"):
-        response = send_and_receive(ser, command)
+        response = send_and_receive(cat, command)
         st.code(response or "[Sin respuesta]", language='text')
 
 if __name__ == "__main__":
@@ -1,9 +1,14 @@
+import os
+import sys
 import serial
-import time
 import streamlit as st
 from streamlit_autorefresh import st_autorefresh
 
-SERIAL_PORT = 'COM13'
+# Permite importar el paquete ts2000 desde la raíz del proyecto
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ts2000.cat import CatTransport, CatError
+
+SERIAL_PORT = os.environ.get('TS2000_PORT', 'COM13')
 BAUDRATE = 9600
 
 MODES = {
@@ -22,67 +27,47 @@ def init_serial():
         )
         ser.dtr = False
         ser.rts = False
-        return ser
+        return CatTransport(ser)
     except Exception as e:
         st.error(f"No se pudo abrir el puerto {SERIAL_PORT}: {e}")
         return None
 
-def get_freq(ser, cmd):
+def get_freq(cat, cmd):
     try:
-        ser.reset_input_buffer()
-        ser.write(cmd.encode())
-        time.sleep(0.2)
-        response = ser.read_all().decode().strip()
-        for part in response.split(';'):
-            if part.startswith(cmd[:2]):
-                hz = int(part[2:])
-                return f"{hz / 1_000_000:.5f} MHz"
-    except:
+        part = cat.query(cmd)
+        hz = int(part[2:])
+        return f"{hz / 1_000_000:.5f} MHz"
+    except Exception:
         return None
-    return None
 
 def get_mode_from_if(response):
     if response.startswith("IF") and len(response) > 29:
         return MODES.get(response[29], "---")
     return "---"
 
-def get_mode_vfo_a(ser):
+def get_mode_vfo_a(cat):
     try:
-        ser.reset_input_buffer()
-        ser.write(b'IF;')
-        time.sleep(0.3)
-        response = ser.read_all().decode().strip()
-        return get_mode_from_if(response)
-    except:
+        return get_mode_from_if(cat.query('IF;'))
+    except Exception:
         return "---"
 
-def get_mode_vfo_b_once(ser):
+def get_mode_vfo_b_once(cat):
     try:
-        ser.reset_input_buffer()
-        ser.write(b'FR1;')
-        time.sleep(0.3)
-        ser.reset_input_buffer()
-        ser.write(b'IF;')
-        time.sleep(0.3)
-        response = ser.read_all().decode().strip()
-        mode_b = get_mode_from_if(response)
-        ser.reset_input_buffer()
-        ser.write(b'FR0;')  # Restaurar VFO A
-        time.sleep(0.3)
+        cat.set('FR1;')
+        try:
+            mode_b = get_mode_from_if(cat.query('IF;'))
+        finally:
+            cat.set('FR0;')  # Restaurar VFO A
         return mode_b
-    except:
+    except Exception:
         return "---"
 
-def get_smeter_level_main(ser):
+def get_smeter_level_main(cat):
     try:
-        ser.reset_input_buffer()
-        ser.write(b'SM0;')
-        time.sleep(0.2)
-        response = ser.read_all().decode().strip()
+        response = cat.query('SM0;')
         if response.startswith('SM0'):
-            val = int(response[3:7])  # Ejemplo: "0024"
-            return val
-    except:
+            return int(response[3:7])  # Ejemplo: "0024"
+    except Exception:
         pass
     return None
 
@@ -144,20 +129,20 @@ def draw_digital_smeter(val):
         <div style='font-size:14px;color:#888;margin-top:2px;'>Valor SM: {val:04d}</div>
     """, unsafe_allow_html=True)
 
-def display_tab(ser):
+def display_tab(cat):
     st_autorefresh(interval=1000, limit=None, key="refresh_display")
     if 'last_vfo_a' not in st.session_state:
         st.session_state.last_vfo_a = "--.----- MHz"
     if 'last_vfo_b' not in st.session_state:
         st.session_state.last_vfo_b = "--.----- MHz"
     if 'last_mode_a' not in st.session_state:
-        st.session_state.last_mode_a = get_mode_vfo_a(ser)
+        st.session_state.last_mode_a = get_mode_vfo_a(cat)
     if 'last_mode_b' not in st.session_state:
-        st.session_state.last_mode_b = get_mode_vfo_b_once(ser)
+        st.session_state.last_mode_b = get_mode_vfo_b_once(cat)
 
-    vfo_a = get_freq(ser, 'FA;')
-    vfo_b = get_freq(ser, 'FB;')
-    mode_a = get_mode_vfo_a(ser)
+    vfo_a = get_freq(cat, 'FA;')
+    vfo_b = get_freq(cat, 'FB;')
+    mode_a = get_mode_vfo_a(cat)
 
     if vfo_a and vfo_a != st.session_state.last_vfo_a:
         st.session_state.last_vfo_a = vfo_a
@@ -192,13 +177,13 @@ def display_tab(ser):
             unsafe_allow_html=True
         )
 
-    sm_val = get_smeter_level_main(ser)
+    sm_val = get_smeter_level_main(cat)
     if sm_val is not None:
         draw_digital_smeter(sm_val)
     else:
         st.markdown("<div style='color:orange;'>No se pudo leer el nivel de señal (SM)</div>", unsafe_allow_html=True)
 
-def control_tab(ser):
+def control_tab(cat):
     st.markdown("<div style='font-size:22px;font-weight:bold;margin-bottom:16px;'>Control rápido de VFOs</div>", unsafe_allow_html=True)
     col_a, col_b = st.columns(2)
     # VFO A
@@ -212,16 +197,12 @@ def control_tab(ser):
                 try:
                     freq_hz = int(float(freq_a_set) * 1000)
                     freq_str = str(freq_hz).zfill(11)
-                    ser.write(b"FR0;")
-                    time.sleep(0.18)
-                    ser.read_all()
-                    ser.write(f"FA{freq_str};".encode())
-                    time.sleep(0.18)
-                    ser.read_all()
-                    ser.write(f"MD{MODES_REV[mode_a_set]};".encode())
-                    time.sleep(0.18)
-                    ser.read_all()
+                    cat.set("FR0;")
+                    cat.set(f"FA{freq_str};")
+                    cat.set(f"MD{MODES_REV[mode_a_set]};")
                     st.success("✅ Comandos enviados a VFO A.")
+                except CatError as e:
+                    st.error(f"❌ {e}")
                 except Exception as e:
                     st.error("❌ Ingresa una frecuencia válida en kHz")
 
@@ -236,33 +217,27 @@ def control_tab(ser):
                 try:
                     freq_hz = int(float(freq_b_set) * 1000)
                     freq_str = str(freq_hz).zfill(11)
-                    ser.write(b"FR1;")
-                    time.sleep(0.18)
-                    ser.read_all()
-                    ser.write(f"FA{freq_str};".encode())
-                    time.sleep(0.18)
-                    ser.read_all()
-                    ser.write(f"MD{MODES_REV[mode_b_set]};".encode())
-                    time.sleep(0.18)
-                    ser.read_all()
-                    ser.write(b"FR0;")
-                    time.sleep(0.18)
-                    ser.read_all()
+                    cat.set("FR1;")
+                    cat.set(f"FA{freq_str};")
+                    cat.set(f"MD{MODES_REV[mode_b_set]};")
+                    cat.set("FR0;")
                     st.success("✅ Comandos enviados a VFO B.")
+                except CatError as e:
+                    st.error(f"❌ {e}")
                 except Exception as e:
                     st.error("❌ Ingresa una frecuencia válida en kHz")
 
 def main():
     st.set_page_config(page_title="TS-2000 Control", layout="centered")
-    ser = init_serial()
-    if not ser:
+    cat = init_serial()
+    if not cat:
         return
 
     tab1, tab2 = st.tabs(["🔭 Display", "🎚️ Control VFOs"])
     with tab1:
-        display_tab(ser)
+        display_tab(cat)
     with tab2:
-        control_tab(ser)
+        control_tab(cat)
 
 if __name__ == "__main__":
     main()
@@ -1,141 +1,18 @@
-import streamlit as st
-import serial
 import time
-import serial.tools.list_ports
+import streamlit as st
+import streamlit.components.v1 as components
 from streamlit_autorefresh import st_autorefresh
+from ts2000.live import live_html
+from ts2000.rig import format_freq, smeter_units
+from ts2000.session import init_session_state, init_serial, get_scheduler, get_poller, get_live_server, get_smeter_sampler, get_telemetry_recorder
+from ts2000.telemetry import ReplaySource
+from ts2000.stats import RerunTimer
 
-# ----------- INICIALIZACIÓN SESSION_STATE (NUNCA ESTÁ VACÍO) -----------
-if 'SERIAL_PORT' not in st.session_state:
-    puertos_disponibles = [p.device for p in serial.tools.list_ports.comports()]
-    if puertos_disponibles:
-        st.session_state['SERIAL_PORT'] = puertos_disponibles[0]
-    else:
-        st.session_state['SERIAL_PORT'] = ""
-        st.error("No se detectaron puertos seriales. Ve a Configuración y selecciona uno.")
-        st.stop()
-if 'BAUDRATE' not in st.session_state:
-    st.session_state['BAUDRATE'] = 9600
-if 'DTR' not in st.session_state:
-    st.session_state['DTR'] = False
-if 'RTS' not in st.session_state:
-    st.session_state['RTS'] = False
-
-MODES = {
-    '1': 'LSB', '2': 'USB', '3': 'CW', '4': 'FM',
-    '5': 'AM', '6': 'FSK', '7': 'CW-R', '8': 'FSK-R'
-}
-@st.cache_resource
-def init_serial():
-    try:
-        port = st.session_state['SERIAL_PORT']
-        baud = st.session_state['BAUDRATE']
-        dtr = st.session_state['DTR']
-        rts = st.session_state['RTS']
-        ser = serial.Serial(
-            port=port,
-            baudrate=baud,
-            timeout=1
-        )
-        ser.dtr = dtr
-        ser.rts = rts
-        return ser
-    except Exception as e:
-        st.error(f"No se pudo abrir el puerto {port}: {e}")
-        st.stop()
-        return None
-
-def get_freq(ser, cmd):
-    try:
-        ser.reset_input_buffer()
-        ser.write(cmd.encode())
-        time.sleep(0.2)
-        response = ser.read_all().decode().strip()
-        for part in response.split(';'):
-            if part.startswith(cmd[:2]):
-                hz = int(part[2:])
-                return f"{hz / 1_000_000:.5f} MHz"
-    except:
-        return None
-    return None
-
-def get_mode_from_if(response):
-    if response.startswith("IF") and len(response) > 29:
-        return MODES.get(response[29], "---")
-    return "---"
-
-def get_mode_vfo_a(ser):
-    try:
-        ser.reset_input_buffer()
-        ser.write(b'IF;')
-        time.sleep(0.3)
-        response = ser.read_all().decode().strip()
-        return get_mode_from_if(response)
-    except:
-        return "---"
-
-def get_mode_vfo_b_once(ser):
-    try:
-        ser.reset_input_buffer()
-        ser.write(b'FR1;')
-        time.sleep(0.3)
-        ser.reset_input_buffer()
-        ser.write(b'IF;')
-        time.sleep(0.3)
-        response = ser.read_all().decode().strip()
-        mode_b = get_mode_from_if(response)
-        ser.reset_input_buffer()
-        ser.write(b'FR0;')
-        time.sleep(0.3)
-        return mode_b
-    except:
-        return "---"
-
-def get_smeter_level_main(ser):
-    try:
-        ser.reset_input_buffer()
-        ser.write(b'SM0;')
-        time.sleep(0.2)
-        response = ser.read_all().decode().strip()
-        if response.startswith('SM0'):
-            val = int(response[3:7])
-            return val
-    except:
-        pass
-    return None
+timer = RerunTimer("Display")
+init_session_state()
 
 def draw_digital_smeter(val):
-    s_label = ""
-    s_units = 0
-    if val >= 30:
-        s_label = "S9+60dB"
-        s_units = 12
-    elif val >= 24:
-        s_label = "S9+40dB"
-        s_units = 11
-    elif val >= 20:
-        s_label = "S9+20dB"
-        s_units = 10
-    elif val >= 17:
-        s_label = "S9+10dB"
-        s_units = 9
-    elif val >= 15:
-        s_label = "S9"
-        s_units = 8
-    elif val >= 12:
-        s_label = "S7"
-        s_units = 7
-    elif val >= 9:
-        s_label = "S5"
-        s_units = 6
-    elif val >= 6:
-        s_label = "S3"
-        s_units = 5
-    elif val >= 3:
-        s_label = "S1"
-        s_units = 4
-    else:
-        s_label = "S0"
-        s_units = 0
+    s_label, s_units = smeter_units(val)
 
     filled_color = [
         "#ff0", "#ff0", "#ff0", "#ff0",
@@ -161,64 +38,122 @@ def draw_digital_smeter(val):
         <div style='font-size:14px;color:#888;margin-top:2px;'>Valor SM: {val:04d}</div>
     """, unsafe_allow_html=True)
 
+def draw_static_display(rig):
+    st.markdown("<div style='height: 30px'></div>", unsafe_allow_html=True)
+
+    col1, col2 = st.columns([1, 5])
+    with col1:
+        st.markdown("<div style='font-size:20px; color:#0af;'>🔵 MAIN</div>", unsafe_allow_html=True)
+        st.markdown("<div style='font-size:28px; color:#888;'>VFO A</div>", unsafe_allow_html=True)
+    with col2:
+        st.markdown(
+            f"<div style='font-size:64px; color:#f80; font-family:monospace;'>"
+            f"{format_freq(rig.vfo_a)} "
+            f"<span style='font-size:24px; color:#0af;'>[{rig.mode_a}]</span>"
+            f"</div>",
+            unsafe_allow_html=True
+        )
+        # Estado extra que llega en la misma respuesta IF
+        flags = [f"<span style='color:#f00;'>{f}</span>" if f == "TX" else f for f in rig.flags()]
+        st.markdown(f"<div style='font-size:16px; color:#888;'>{' · '.join(flags)}</div>", unsafe_allow_html=True)
+
+    col3, col4 = st.columns([1, 5])
+    with col3:
+        st.markdown("<div style='font-size:28px; color:#888;'>VFO B</div>", unsafe_allow_html=True)
+    with col4:
+        st.markdown(
+            f"<div style='font-size:28px; color:#f80; font-family:monospace;'>"
+            f"{format_freq(rig.vfo_b)} "
+            f"<span style='font-size:18px; color:#0af;'>[{rig.mode_b}]</span>"
+            f"</div>",
+            unsafe_allow_html=True
+        )
+
+    if rig.smeter is not None:
+        draw_digital_smeter(rig.smeter)
+    else:
+        st.markdown("<div style='color:orange;'>No se pudo leer el nivel de señal (SM)</div>", unsafe_allow_html=True)
+
+    age = rig.age()
+    if age is not None and age > 3:
+        st.markdown(f"<div style='color:orange;'>Sin datos nuevos del radio desde hace {age:.0f} s</div>", unsafe_allow_html=True)
+
+HISTORY_SECONDS = 60
+
+@st.fragment(run_every=1.0)
+def draw_smeter_history(sampler):
+    # Solo este fragmento se reejecuta cada segundo, no toda la página
+    now = time.time()
+    stats = sampler.ring.stats(HISTORY_SECONDS, now=now)
+    if stats is None:
+        st.caption("Sin muestras del S-meter todavía")
+        return
+    times, values = sampler.ring.window(HISTORY_SECONDS, now=now)
+    st.line_chart({"Segundos": times - now, "SM": values}, x="Segundos", y="SM", height=140)
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Pico", f"{stats['peak']:02d}")
+    c2.metric("Promedio", f"{stats['avg']:.1f}")
+    c3.metric("Mín.", f"{stats['min']:02d}")
+    c4.metric("Máx.", f"{stats['max']:02d}")
+
 st.title("🔭 Display TS-2000")
-st.caption("Lectura automática cada segundo")
 
-ser = init_serial()
-if not ser:
+cat = init_serial()
+if not cat:
     st.stop()
 
-st_autorefresh(interval=1000, limit=None, key="refresh_display")
-
-if 'last_vfo_a' not in st.session_state:
-    st.session_state.last_vfo_a = "--.----- MHz"
-if 'last_vfo_b' not in st.session_state:
-    st.session_state.last_vfo_b = "--.----- MHz"
-if 'last_mode_a' not in st.session_state:
-    st.session_state.last_mode_a = get_mode_vfo_a(ser)
-if 'last_mode_b' not in st.session_state:
-    st.session_state.last_mode_b = get_mode_vfo_b_once(ser)
-
-vfo_a = get_freq(ser, 'FA;')
-vfo_b = get_freq(ser, 'FB;')
-mode_a = get_mode_vfo_a(ser)
-
-if vfo_a and vfo_a != st.session_state.last_vfo_a:
-    st.session_state.last_vfo_a = vfo_a
-if vfo_b and vfo_b != st.session_state.last_vfo_b:
-    st.session_state.last_vfo_b = vfo_b
-if mode_a and mode_a != st.session_state.last_mode_a:
-    st.session_state.last_mode_a = mode_a
-
-st.markdown("<div style='height: 30px'></div>", unsafe_allow_html=True)
-
-col1, col2 = st.columns([1, 5])
-with col1:
-    st.markdown("<div style='font-size:20px; color:#0af;'>🔵 MAIN</div>", unsafe_allow_html=True)
-    st.markdown("<div style='font-size:28px; color:#888;'>VFO A</div>", unsafe_allow_html=True)
-with col2:
-    st.markdown(
-        f"<div style='font-size:64px; color:#f80; font-family:monospace;'>"
-        f"{st.session_state.last_vfo_a} "
-        f"<span style='font-size:24px; color:#0af;'>[{st.session_state.last_mode_a}]</span>"
-        f"</div>",
-        unsafe_allow_html=True
-    )
-
-col3, col4 = st.columns([1, 5])
-with col3:
-    st.markdown("<div style='font-size:28px; color:#888;'>VFO B</div>", unsafe_allow_html=True)
-with col4:
-    st.markdown(
-        f"<div style='font-size:28px; color:#f80; font-family:monospace;'>"
-        f"{st.session_state.last_vfo_b} "
-        f"<span style='font-size:18px; color:#0af;'>[{st.session_state.last_mode_b}]</span>"
-        f"</div>",
-        unsafe_allow_html=True
-    )
-
-sm_val = get_smeter_level_main(ser)
-if sm_val is not None:
-    draw_digital_smeter(sm_val)
+# El poller compartido consulta el radio; esta página solo lee su última foto
+port = st.session_state['SERIAL_PORT']
+poller = get_poller(port, get_scheduler(port, cat))
+live = get_live_server(port, poller)
+recorder = get_telemetry_recorder(port, poller)
+
+# ----------- REPRODUCCIÓN DE LO GRABADO -----------
+REPLAY_SPEEDS = [1, 2, 5, 10, 20, 50, 100]
+with st.sidebar:
+    st.subheader("⏪ Reproducir grabación")
+    minutes = st.number_input("Últimos minutos", value=10, min_value=1, max_value=7 * 24 * 60)
+    speed = st.select_slider("Velocidad", REPLAY_SPEEDS, value=10, format_func=lambda x: f"{x}×")
+    col_play, col_stop = st.columns(2)
+    if col_play.button("▶️ Reproducir", use_container_width=True):
+        old = st.session_state.pop('REPLAY', None)
+        if old:
+            old.stop()
+        table = recorder.query(start=time.time() - minutes * 60)
+        if table.num_rows:
+            st.session_state['REPLAY'] = ReplaySource(table, speed).start()
+        else:
+            st.warning("No hay nada grabado en ese rango")
+    if col_stop.button("⏹️ En vivo", use_container_width=True) and 'REPLAY' in st.session_state:
+        st.session_state.pop('REPLAY').stop()
+    st.caption(f"Grabados {recorder.rows_written:,} cambios en {recorder.row_groups} grupos")
+
+replay = st.session_state.get('REPLAY')
+
+
+@st.fragment(run_every=0.25)
+def draw_replay():
+    t, done = replay.position()
+    st.progress(done, text=f"Reproduciendo {time.strftime('%H:%M:%S', time.localtime(t)) if t else '--'} "
+                           f"a {replay.speed:g}× ({len(replay):,} cambios)")
+    draw_static_display(replay.snapshot())
+
+
+if replay is not None:
+    st.caption("Reproduciendo una grabación; presiona **En vivo** en la barra lateral para volver")
+    draw_replay()
+elif live is not None:
+    # La página se dibuja una sola vez; el componente recibe por SSE solo los cambios
+    st.caption("En vivo: solo se actualizan los campos que cambian")
+    components.html(live_html(live.port), height=340)
 else:
-    st.markdown("<div style='color:orange;'>No se pudo leer el nivel de señal (SM)</div>", unsafe_allow_html=True)
+    st.caption("Lectura automática cada segundo")
+    st_autorefresh(interval=1000, limit=None, key="refresh_display")
+    # Foto en memoria del poller: no toca el puerto, no cuenta como E/S serie
+    rig = poller.snapshot()
+    draw_static_display(rig)
+
+st.subheader(f"S-meter, últimos {HISTORY_SECONDS} s")
+draw_smeter_history(get_smeter_sampler(port, poller))
+
+timer.finish()
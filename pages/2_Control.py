@@ -1,104 +1,92 @@
 import streamlit as st
-import serial
-import time
-import serial.tools.list_ports
-
-# ----------- INICIALIZACIÓN SESSION_STATE (NUNCA ESTÁ VACÍO) -----------
-if 'SERIAL_PORT' not in st.session_state:
-    puertos_disponibles = [p.device for p in serial.tools.list_ports.comports()]
-    if puertos_disponibles:
-        st.session_state['SERIAL_PORT'] = puertos_disponibles[0]
-    else:
-        st.session_state['SERIAL_PORT'] = ""
-        st.error("No se detectaron puertos seriales. Ve a Configuración y selecciona uno.")
-        st.stop()
-if 'BAUDRATE' not in st.session_state:
-    st.session_state['BAUDRATE'] = 9600
-if 'DTR' not in st.session_state:
-    st.session_state['DTR'] = False
-if 'RTS' not in st.session_state:
-    st.session_state['RTS'] = False
-
-MODES = {
-    '1': 'LSB', '2': 'USB', '3': 'CW', '4': 'FM',
-    '5': 'AM', '6': 'FSK', '7': 'CW-R', '8': 'FSK-R'
-}
-MODES_REV = {v: k for k, v in MODES.items()}
-@st.cache_resource
-def init_serial():
-    try:
-        port = st.session_state['SERIAL_PORT']
-        baud = st.session_state['BAUDRATE']
-        dtr = st.session_state['DTR']
-        rts = st.session_state['RTS']
-        ser = serial.Serial(
-            port=port,
-            baudrate=baud,
-            timeout=1
-        )
-        ser.dtr = dtr
-        ser.rts = rts
-        return ser
-    except Exception as e:
-        st.error(f"No se pudo abrir el puerto {port}: {e}")
-        st.stop()
-        return None
+from concurrent.futures import TimeoutError as FuturesTimeout
+from ts2000.cat import CatError
+from ts2000.rig import MODES, format_freq
+from ts2000.session import init_session_state, init_serial, get_scheduler, get_poller, get_rig_control
+from ts2000.stats import RerunTimer
+
+timer = RerunTimer("Control")
+init_session_state()
 
 st.title("🎚️ Control rápido de VFOs TS-2000")
 
-ser = init_serial()
-if not ser:
+cat = init_serial()
+if not cat:
     st.stop()
 
-col_a, col_b = st.columns(2)
+# Las escrituras del operador pasan por el planificador, antes que el sondeo de
+# fondo, y solo se manda lo que difiere del estado conocido del radio
+port = st.session_state['SERIAL_PORT']
+sched = get_scheduler(port, cat)
+poller = get_poller(port, sched)
+control = get_rig_control(port, sched, poller)
+# Mientras se usa esta página el poller lee todo a su ritmo más rápido
+poller.mark_activity()
+CONTROL_TIMEOUT = 2.0
+TUNING_STEPS = {"10 Hz": 10, "100 Hz": 100, "1 kHz": 1000, "5 kHz": 5000, "12.5 kHz": 12500, "100 kHz": 100_000}
 
-with col_a:
-    st.markdown("<div style='font-size:20px;color:#0af;padding-bottom:6px;'>VFO A</div>", unsafe_allow_html=True)
-    with st.form("set_vfo_a"):
-        freq_a_set = st.text_input("Frecuencia (kHz)", value="", key="freq_a_set")
-        mode_a_set = st.selectbox("Modo", list(MODES.values()), index=1, key="mode_a_set")
-        submitted_a = st.form_submit_button("Aplicar a VFO A", use_container_width=True)
-        if submitted_a:
-            try:
-                freq_hz = int(float(freq_a_set) * 1000)
-                freq_str = str(freq_hz).zfill(11)
-                ser.write(f"FA{freq_str};".encode())
-                time.sleep(0.18)
-                ser.read_all()
-                ser.write(f"MD{MODES_REV[mode_a_set]};".encode())
-                time.sleep(0.18)
-                ser.read_all()
-                st.success("✅ Frecuencia y modo enviados a VFO A.")
-            except Exception as e:
-                st.error("❌ Ingresa una frecuencia válida en kHz")
 
+def vfo_form(vfo, color):
+    st.markdown(f"<div style='font-size:20px;color:{color};padding-bottom:6px;'>VFO {vfo}</div>",
+                unsafe_allow_html=True)
+    with st.form(f"set_vfo_{vfo.lower()}"):
+        freq_set = st.text_input("Frecuencia (kHz, vacío = no cambiar)", value="", key=f"freq_{vfo.lower()}_set")
+        mode_set = st.selectbox("Modo", list(MODES.values()), index=1, key=f"mode_{vfo.lower()}_set")
+        if not st.form_submit_button(f"Aplicar a VFO {vfo}", use_container_width=True):
+            return
+        try:
+            freq_hz = int(float(freq_set) * 1000) if freq_set.strip() else None
+            jobs = control.apply(vfo, freq_hz, mode_set)
+            with timer.io():
+                for job in jobs:
+                    job.result(timeout=CONTROL_TIMEOUT)
+            if jobs:
+                st.success(f"✅ {len(jobs)} cambio(s) enviados a VFO {vfo}.")
+            else:
+                st.info(f"VFO {vfo} ya estaba así; no se mandó nada.")
+        except CatError as e:
+            st.error(f"❌ {e}")
+        except FuturesTimeout:
+            st.error("❌ El radio no respondió a tiempo")
+        except Exception as e:
+            st.error("❌ Ingresa una frecuencia válida en kHz")
+
+
+col_a, col_b = st.columns(2)
+with col_a:
+    vfo_form("A", "#0af")
 with col_b:
-    st.markdown("<div style='font-size:20px;color:#08f;padding-bottom:6px;'>VFO B</div>", unsafe_allow_html=True)
-    with st.form("set_vfo_b"):
-        freq_b_set = st.text_input("Frecuencia (kHz)", value="", key="freq_b_set")
-        mode_b_set = st.selectbox("Modo", list(MODES.values()), index=1, key="mode_b_set")
-        submitted_b = st.form_submit_button("Aplicar a VFO B", use_container_width=True)
-        if submitted_b:
-            try:
-                freq_hz = int(float(freq_b_set) * 1000)
-                freq_str = str(freq_hz).zfill(11)
-                # Fijar frecuencia directamente en VFO B
-                ser.write(f"FB{freq_str};".encode())
-                time.sleep(0.18)
-                ser.read_all()
-                # Cambiar a VFO B para cambiar modo (solo así se puede)
-                ser.write(b"FR1;")
-                time.sleep(0.4)
-                ser.read_all()
-                ser.write(f"MD{MODES_REV[mode_b_set]};".encode())
-                time.sleep(0.18)
-                ser.read_all()
-                # Regresar a MAIN
-                ser.write(b"FR0;")
-                time.sleep(0.18)
-                ser.read_all()
-                st.success("✅ Frecuencia y modo enviados a VFO B.")
-            except Exception as e:
-                st.error("❌ Ingresa una frecuencia válida en kHz")
+    vfo_form("B", "#08f")
+
+# ----------- SINTONÍA CONTINUA -----------
+st.subheader("🎛️ Sintonía")
+col_vfo, col_step = st.columns(2)
+tune_vfo = col_vfo.radio("VFO", ["A", "B"], horizontal=True, key="tune_vfo")
+step = TUNING_STEPS[col_step.select_slider("Paso", list(TUNING_STEPS), value="1 kHz", key="tune_step")]
+
+
+def nudge(delta):
+    # Cada clic solo mueve el objetivo; el FA/FB sale una vez, con el último valor
+    control.step(tune_vfo, delta)
+
+
+cols = st.columns(4)
+for col, mult, label in zip(cols, (-10, -1, 1, 10), ("⏪", "◀️", "▶️", "⏩")):
+    col.button(f"{label} {mult * step / 1000:+g} kHz", on_click=nudge, args=(mult * step,),
+               use_container_width=True, key=f"tune_{mult}")
+
+
+@st.fragment(run_every=0.5)
+def draw_tuning():
+    rig = poller.snapshot()
+    radio_hz = getattr(rig, f"vfo_{tune_vfo.lower()}")
+    target = control.target(tune_vfo)
+    col1, col2, col3 = st.columns(3)
+    col1.metric(f"VFO {tune_vfo} (radio)", format_freq(radio_hz))
+    col2.metric("Objetivo", format_freq(target if target is not None else radio_hz))
+    col3.metric("Escrituras enviadas / evitadas", f"{control.sent} / {control.skipped}")
+
 
+draw_tuning()
 
+timer.finish()
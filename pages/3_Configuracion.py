@@ -1,29 +1,128 @@
 import streamlit as st
-import serial.tools.list_ports
+from ts2000.broadcast import FORMATS
+from ts2000.baud import BAUD_RATES, detect_baud, negotiate_baud, measure_throughput, load_link_settings, save_link_settings
+from ts2000.scheduler import PRIORITY_WRITE
+from ts2000.ports import port_label, remember_port
+from ts2000.session import init_serial, get_connections, get_scheduler, get_port_inventory, get_poller, get_rig_control, get_rigctl_server, get_state_broadcaster, link_settings, select_port, selected_port
 
 st.title("⚙️ Configuración de Puerto Serial")
 
-puertos_disponibles = [p.device for p in serial.tools.list_ports.comports()]
-if not puertos_disponibles:
-    puertos_disponibles = ["COM1", "COM2", "COM3", "COM4"]
+# La lista viene del inventario en caché: solo se vuelve a escanear si se
+# conectó o quitó un adaptador (o con el botón)
+inventory = get_port_inventory()
+if st.button("🔄 Volver a buscar puertos"):
+    inventory.ports(force=True)
+ports = {p.device: p for p in inventory.ports()}
+puertos_disponibles = list(ports) or ["COM1", "COM2", "COM3", "COM4"]
+# El puerto es el de la app (el mismo en todas las sesiones). Uno que no
+# enumera comports() (p. ej. el pty del simulador) se conserva
+current = selected_port()
+if current and current not in puertos_disponibles:
+    puertos_disponibles.append(current)
+if current not in puertos_disponibles:
+    current = puertos_disponibles[0]
 
-if 'SERIAL_PORT' not in st.session_state or st.session_state['SERIAL_PORT'] not in puertos_disponibles:
-    st.session_state['SERIAL_PORT'] = puertos_disponibles[0]
-if 'BAUDRATE' not in st.session_state:
-    st.session_state['BAUDRATE'] = 9600
-if 'DTR' not in st.session_state:
-    st.session_state['DTR'] = False
-if 'RTS' not in st.session_state:
-    st.session_state['RTS'] = False
+# ----------- VELOCIDAD DEL RADIO -----------
+# Va antes del formulario para que este ya muestre la velocidad nueva
+st.subheader("Velocidad del puerto")
+saved = load_link_settings(current)
+if saved:
+    rate_text = f"**{saved['baudrate']} baudios**"
+    if saved.get('commands_per_s'):
+        rate_text += f" · {saved['commands_per_s']:.0f} comandos/s · {saved['bytes_per_s']:.0f} B/s medidos"
+    st.markdown(f"Recordada para {current}: {rate_text}")
+col_detect, col_fast = st.columns(2)
+detect = col_detect.button("🔎 Detectar velocidad del radio", use_container_width=True)
+fastest = col_fast.button(f"🚀 Subir a la más rápida estable (hasta {BAUD_RATES[-1]})", use_container_width=True)
+if detect or fastest:
+    port = current
+    cat = init_serial()
+    log = []
 
+    def link_job(cat):
+        # Corre en el hilo del planificador: nadie más usa el puerto mientras tanto
+        rate = detect_baud(cat, first=cat.ser.baudrate)
+        if rate is None:
+            return None, None
+        if fastest:
+            rate = negotiate_baud(cat, rate, log=log.append)
+        return rate, measure_throughput(cat)
+
+    with st.spinner("Probando velocidades…"):
+        try:
+            rate, measured = get_scheduler(port, cat).submit(link_job, PRIORITY_WRITE).result(timeout=60)
+        except Exception as e:
+            rate, measured = None, None
+            st.error(f"❌ {e}")
+    for line in log:
+        st.write(line)
+    if rate:
+        commands_per_s, bytes_per_s, errors = measured
+        save_link_settings(port, {'baudrate': rate, 'commands_per_s': commands_per_s, 'bytes_per_s': bytes_per_s})
+        st.success(f"✅ {rate} baudios · {commands_per_s:.0f} comandos/s · {bytes_per_s:.0f} B/s · {errors} errores")
+    else:
+        st.error("❌ El radio no contestó a ninguna velocidad")
+
+# Baudios/DTR/RTS son del puerto, no de la sesión: se guardan en disco y se
+# aplican al manejador compartido; las demás páginas solo los leen
+settings = link_settings(current)
 with st.form("config_serial"):
-    st.selectbox("Puerto COM", puertos_disponibles, key="SERIAL_PORT")
-    st.number_input("Baudrate", min_value=1200, max_value=115200, value=st.session_state['BAUDRATE'], step=100, key="BAUDRATE")
-    st.checkbox("DTR (Data Terminal Ready)", value=st.session_state['DTR'], key="DTR")
-    st.checkbox("RTS (Request to Send)", value=st.session_state['RTS'], key="RTS")
+    chosen = st.selectbox("Puerto COM", puertos_disponibles, index=puertos_disponibles.index(current),
+                          format_func=lambda d: port_label(ports[d]) if d in ports else d)
+    baudrate = st.number_input("Baudrate", min_value=1200, max_value=115200, value=int(settings['baudrate']), step=100)
+    dtr = st.checkbox("DTR (Data Terminal Ready)", value=settings['dtr'])
+    rts = st.checkbox("RTS (Request to Send)", value=settings['rts'])
     submitted = st.form_submit_button("Guardar configuración")
     if submitted:
-        st.success("✅ Configuración guardada. Las páginas usarán estos valores automáticamente.")
+        # Se recuerda por número de serie / VID:PID, no por el nombre de /dev
+        remember_port(inventory.key_for(chosen))
+        save_link_settings(chosen, {'baudrate': int(baudrate), 'dtr': dtr, 'rts': rts})
+        try:
+            select_port(chosen)
+            get_connections().configure(chosen, int(baudrate), dtr, rts)
+            st.success("✅ Configuración guardada. Se aplica al puerto para todas las páginas y sesiones.")
+        except Exception as e:
+            st.error(f"No se pudo abrir el puerto {chosen}: {e}")
+
+# ----------- SERVIDOR RIGCTLD -----------
+st.subheader("Servidor rigctld (Hamlib)")
+st.caption("Loggers y programas de modos digitales se conectan como \"NET rigctl\" y comparten el puerto con la web")
+# Un servidor por radio, compartido por todas las sesiones: el interruptor
+# muestra si está corriendo, lo haya encendido quien sea
+port = selected_port()
+cat = init_serial()
+sched = get_scheduler(port, cat)
+poller = get_poller(port, sched)
+server = get_rigctl_server(port, poller, get_rig_control(port, sched, poller))
+if st.toggle("Activar servidor rigctld", value=server.running()):
+    try:
+        server.start()
+        st.success(f"Escuchando en {server.host}:{server.port} · {server.clients()} clientes · {server.requests()} peticiones")
+    except OSError as e:
+        st.error(f"❌ No se pudo abrir el puerto TCP {server.port}: {e}")
+elif server.running():
+    server.stop()
+
+# ----------- DIFUSIÓN UDP -----------
+st.subheader("Difusión UDP de cambios")
+st.caption("Un datagrama por cambio de frecuencia/modo para loggers y pantallas; no agrega tráfico serie")
+# Una difusión por radio, compartida por todas las sesiones: los controles
+# muestran la que está corriendo, la abra quien la abra
+broadcaster = get_state_broadcaster(port, poller)
+col_host, col_port, col_fmt = st.columns(3)
+udp_host = col_host.text_input("Dirección (unicast, broadcast o multicast)", value=broadcaster.address[0])
+udp_port = col_port.number_input("Puerto UDP", value=broadcaster.address[1], min_value=1, max_value=65535)
+udp_fmt = col_fmt.selectbox("Formato", list(FORMATS), index=list(FORMATS).index(broadcaster.fmt),
+                            format_func=lambda f: {'json': "JSON", 'n1mm': "N1MM RadioInfo (XML)"}[f])
+if st.toggle("Activar difusión", value=broadcaster.running()):
+    try:
+        broadcaster.configure(udp_host, int(udp_port), udp_fmt).start()
+        st.success(f"Difundiendo a {udp_host}:{int(udp_port)} · {broadcaster.sent} datagramas enviados")
+    except OSError as e:
+        broadcaster.stop()
+        st.error(f"❌ No se pudo usar {udp_host}: {e}")
+elif broadcaster.running():
+    broadcaster.stop()
 
 st.info("Si tu puerto no aparece, verifica que el equipo esté conectado y no lo esté usando otro programa.")
 
@@ -0,0 +1,111 @@
+import time
+import altair as alt
+import streamlit as st
+from streamlit_autorefresh import st_autorefresh
+from ts2000.session import init_session_state, init_serial, get_scheduler, get_poller, get_connections
+from ts2000.stats import RERUNS
+
+init_session_state()
+
+st.title("🩺 Diagnóstico CAT")
+st.caption("Contadores del transporte serie y tiempo de cada reejecución de las páginas")
+
+cat = init_serial()
+if not cat:
+    st.stop()
+
+port = st.session_state['SERIAL_PORT']
+poller = get_poller(port, get_scheduler(port, cat))
+
+st_autorefresh(interval=2000, limit=None, key="refresh_diag")
+
+stats = cat.stats
+elapsed = max(1e-6, time.time() - stats.started)
+
+col1, col2, col3, col4 = st.columns(4)
+col1.metric("Bytes enviados", f"{stats.bytes_out:,}")
+col2.metric("Bytes recibidos", f"{stats.bytes_in:,}")
+col3.metric("Bytes/s", f"{(stats.bytes_in + stats.bytes_out) / elapsed:.0f}")
+col4.metric("Auto-Information", "Activo" if poller.ai_active else "Apagado")
+
+connections = get_connections()
+ser = cat.ser
+st.caption(
+    f"Puerto {port} a {ser.baudrate} baudios (DTR {'sí' if ser.dtr else 'no'}, RTS {'sí' if ser.rts else 'no'}) · "
+    f"reconexiones: {connections.reconnects} · "
+    + ", ".join(f"{p}: {estado}" for p, estado in connections.ports().items())
+)
+if cat.failed is not None:
+    st.error(f"Puerto perdido, reintentando: {cat.failed}")
+
+st.subheader("Por comando")
+rows = stats.summary()
+if rows:
+    st.dataframe(rows, use_container_width=True, hide_index=True)
+else:
+    st.info("Todavía no se ha enviado ningún comando.")
+
+st.subheader("Latencias recientes")
+hist = stats.histogram()
+if any(count for _, count in hist):
+    data = alt.Data(values=[{'Latencia': label, 'Comandos': count} for label, count in hist])
+    chart = alt.Chart(data).mark_bar().encode(
+        x=alt.X('Latencia:N', sort=None),
+        y='Comandos:Q',
+    )
+    st.altair_chart(chart, use_container_width=True)
+
+st.subheader("Reejecuciones de las páginas")
+reruns = RERUNS.summary()
+if reruns:
+    st.dataframe(reruns, use_container_width=True, hide_index=True)
+else:
+    st.info("Abre Display o Control para ver cuánto tarda cada reejecución.")
+
+st.subheader("Sondeo adaptativo")
+planner = poller.planner
+st.caption(
+    "Cada campo se consulta más seguido mientras cambia o mientras se usa Control, y se espacia "
+    "cuando no cambia. El tope incluye el historial del S-meter; durante un barrido de banda el sondeo baja a su mínimo. " + ("Con Auto-Information, IF/FA/FB solo se resincronizan." if poller.ai_active else "")
+)
+
+
+def set_max_rate(planner):
+    # Solo cuando alguien cambia el número: el planificador es de todas las sesiones
+    planner.set_max_rate(st.session_state['POLL_MAX_RATE'])
+
+
+st.number_input("Tope de lecturas de fondo (comandos/s)", min_value=1.0, max_value=50.0,
+                value=float(planner.max_rate), step=1.0, key="POLL_MAX_RATE",
+                on_change=set_max_rate, args=(planner,))
+st.dataframe(planner.rows(), use_container_width=True, hide_index=True)
+
+st.subheader("Captura del tráfico CAT")
+capture = cat.capture
+if capture is not None:
+    st.caption(
+        f"{len(capture):,} bloques en memoria (los más recientes). Se reproduce sin radio con "
+        "ReplaySerial; `python -m ts2000.capture archivo` la muestra como línea de tiempo."
+    )
+    # Serializar todo el buffer cuesta; solo se hace al pedirlo, no en cada refresco
+    col1, col2, col3 = st.columns(3)
+    if col1.button("Tomar captura"):
+        st.session_state['CAPTURE_DUMP'] = (
+            time.strftime("captura_ts2000_%Y%m%d_%H%M%S.jsonl"),
+            capture.dumps({'port': port, 'baudrate': ser.baudrate}),
+        )
+    if 'CAPTURE_DUMP' in st.session_state:
+        name, text = st.session_state['CAPTURE_DUMP']
+        col2.download_button("Descargar " + name, data=text, file_name=name, mime="application/jsonl")
+    if col3.button("Vaciar captura"):
+        capture.clear()
+        st.session_state.pop('CAPTURE_DUMP', None)
+        st.rerun()
+
+if poller.last_errors:
+    st.warning("Errores del último sondeo: " + ", ".join(f"{k}: {v}" for k, v in poller.last_errors.items()))
+
+if st.button("Reiniciar contadores"):
+    stats.reset()
+    RERUNS.reset()
+    st.rerun()
@@ -0,0 +1,90 @@
+import altair as alt
+import numpy as np
+import streamlit as st
+from ts2000.session import init_session_state, init_serial, get_scheduler, get_poller, get_band_scan
+
+init_session_state()
+
+st.title("📶 Barrido de banda")
+st.caption("Sintoniza y mide el S-meter en ráfaga; la velocidad la limita el radio, no pausas fijas")
+
+cat = init_serial()
+if not cat:
+    st.stop()
+
+port = st.session_state['SERIAL_PORT']
+sched = get_scheduler(port, cat)
+scan = get_band_scan(port, sched, get_poller(port, sched))
+
+with st.form("scan_params"):
+    col1, col2, col3 = st.columns(3)
+    start_mhz = col1.number_input("Inicio (MHz)", value=144.000, step=0.005, format="%.5f")
+    stop_mhz = col2.number_input("Fin (MHz)", value=148.000, step=0.005, format="%.5f")
+    step_khz = col3.number_input("Paso (kHz)", value=5.0, min_value=0.01, step=1.0)
+    col4, col5, col6 = st.columns(3)
+    dwell_ms = col4.number_input("Dwell máx. (ms)", value=300, min_value=10, step=10)
+    threshold = col5.number_input("Pausar si SM ≥ (0 = nunca)", value=0, min_value=0, max_value=30)
+    hold_s = col6.number_input("Reanudar tras (s, 0 = manual)", value=3.0, min_value=0.0, step=0.5)
+    sweeps = st.number_input("Barridos", value=1, min_value=1, max_value=200)
+    submitted = st.form_submit_button("▶️ Iniciar barrido", disabled=scan.running())
+    if submitted:
+        try:
+            scan.start(
+                int(round(start_mhz * 1_000_000)), int(round(stop_mhz * 1_000_000)),
+                int(round(step_khz * 1000)),
+                dwell=dwell_ms / 1000,
+                threshold=threshold or None,
+                hold=hold_s or None,
+                sweeps=int(sweeps),
+            )
+        except (ValueError, RuntimeError) as e:
+            st.error(f"❌ {e}")
+
+col_a, col_b, col_c = st.columns(3)
+if col_a.button("⏸️ Pausar", disabled=scan.state != 'running'):
+    scan.pause()
+if col_b.button("⏯️ Reanudar", disabled=scan.state != 'paused'):
+    scan.resume()
+if col_c.button("⏹️ Detener", disabled=not scan.running()):
+    scan.stop()
+
+
+@st.fragment(run_every=0.5)
+def draw_results():
+    if not len(scan.freqs):
+        st.info("Configura el rango y presiona Iniciar.")
+        return
+    st.progress(scan.progress(), text=f"Estado: {scan.state} · {scan.steps_per_second():.1f} pasos/s")
+    if scan.message:
+        st.error(scan.message)
+
+    mhz = scan.freqs / 1_000_000
+    # Espectro: el barrido en curso (o el último completo)
+    row = min(scan.sweep, scan.levels.shape[0] - 1)
+    current = scan.levels[row]
+    mask = ~np.isnan(current)
+    if mask.any():
+        st.line_chart({"MHz": mhz[mask], "SM": current[mask]}, x="MHz", y="SM", height=220)
+
+    # Cascada: un renglón por barrido
+    if scan.levels.shape[0] > 1:
+        sweeps_idx, steps_idx = np.nonzero(~np.isnan(scan.levels))
+        values = [
+            {'MHz': float(mhz[j]), 'Barrido': int(i), 'SM': float(scan.levels[i, j])}
+            for i, j in zip(sweeps_idx, steps_idx)
+        ]
+        if values:
+            chart = alt.Chart(alt.Data(values=values)).mark_rect().encode(
+                x=alt.X('MHz:O', axis=alt.Axis(labelOverlap=True)),
+                y=alt.Y('Barrido:O'),
+                color=alt.Color('SM:Q', scale=alt.Scale(scheme='inferno', domain=[0, 30])),
+            )
+            st.altair_chart(chart, use_container_width=True)
+
+    if scan.hits:
+        st.subheader("Señales sobre el umbral")
+        st.dataframe([{'MHz': f"{f / 1_000_000:.5f}", 'SM': lvl} for f, lvl in scan.hits[-50:]],
+                     hide_index=True, use_container_width=True)
+
+
+draw_results()
@@ -0,0 +1,72 @@
+import time
+import streamlit as st
+from ts2000.memory import MemoryBank, dump_memories, restore_memories
+from ts2000.session import init_session_state, init_serial, get_scheduler
+
+init_session_state()
+
+st.title("💾 Canales de memoria")
+st.caption("Respaldo de los 300 canales (MR) y restauración escribiendo solo los que cambiaron (MW)")
+
+cat = init_serial()
+if not cat:
+    st.stop()
+
+port = st.session_state['SERIAL_PORT']
+sched = get_scheduler(port, cat)
+
+# Última lectura conocida del radio: la caché en disco hasta que se lea de nuevo
+if 'MEMORY_BANK' not in st.session_state:
+    st.session_state['MEMORY_BANK'] = MemoryBank.load()
+bank = st.session_state['MEMORY_BANK']
+
+
+def show_progress(bar, label):
+    return lambda done, total: bar.progress(done / max(1, total), text=f"{label} {done}/{total}")
+
+
+col1, col2 = st.columns(2)
+if col1.button("📥 Leer memorias del radio", use_container_width=True):
+    bar = st.progress(0.0)
+    start = time.monotonic()
+    bank, errors = dump_memories(sched, progress=show_progress(bar, "Leyendo"))
+    bank.port = port
+    bank.save()
+    st.session_state['MEMORY_BANK'] = bank
+    st.success(f"✅ {len(bank)} lecturas en {time.monotonic() - start:.1f} s")
+    if errors:
+        st.warning(f"{len(errors)} canales sin respuesta: {', '.join(errors[:10])}")
+
+if bank is None:
+    st.info("Aún no hay respaldo. Presiona **Leer memorias del radio**.")
+    st.stop()
+
+read_at = time.strftime("%Y-%m-%d %H:%M", time.localtime(bank.read_at)) if bank.read_at else "?"
+st.markdown(f"**Última lectura:** {read_at} · puerto {bank.port or '?'}")
+col2.download_button("💾 Descargar respaldo", bank.to_json(), file_name="memorias_ts2000.json",
+                     mime="application/json", use_container_width=True)
+
+rows = bank.rows()
+if rows:
+    st.dataframe(rows, hide_index=True, use_container_width=True)
+else:
+    st.info("Todos los canales están vacíos.")
+
+st.subheader("Restaurar")
+uploaded = st.file_uploader("Archivo de memorias (.json)", type="json")
+if uploaded is not None:
+    try:
+        target = MemoryBank.from_json(uploaded.getvalue().decode())
+    except ValueError as e:
+        st.error(f"❌ Archivo inválido: {e}")
+        st.stop()
+    pending = [k for k in bank.diff(target) if target.channels.get(k)]
+    st.write(f"Canales distintos a la última lectura: **{len(pending)}**")
+    if pending and st.button(f"📤 Escribir {len(pending)} canales", type="primary"):
+        bar = st.progress(0.0)
+        start = time.monotonic()
+        written, errors = restore_memories(sched, target, bank, progress=show_progress(bar, "Escribiendo"))
+        bank.save()
+        st.success(f"✅ {len(written)} canales escritos en {(time.monotonic() - start) * 1000:.0f} ms")
+        if errors:
+            st.error("Fallaron: " + ", ".join(errors[:10]))
@@ -0,0 +1,75 @@
+import time
+import streamlit as st
+from ts2000.menu import MenuSnapshot, read_menu, restore_menu
+from ts2000.session import init_session_state, init_serial, get_scheduler
+
+MENU_CACHE = "menu_ts2000.json"
+
+init_session_state()
+
+st.title("⚙️ Menú EX")
+st.caption("Foto de todo el menú del radio y perfiles que solo escriben lo que cambió")
+
+cat = init_serial()
+if not cat:
+    st.stop()
+
+sched = get_scheduler(st.session_state['SERIAL_PORT'], cat)
+
+if 'MENU_SNAPSHOT' not in st.session_state:
+    st.session_state['MENU_SNAPSHOT'] = MenuSnapshot.load(MENU_CACHE)
+snapshot = st.session_state['MENU_SNAPSHOT']
+
+
+def show_progress(bar, label):
+    return lambda done, total: bar.progress(done / max(1, total), text=f"{label} {done}/{total}")
+
+
+if st.button("📥 Leer menú del radio"):
+    bar = st.progress(0.0)
+    start = time.monotonic()
+    snapshot, errors = read_menu(sched, progress=show_progress(bar, "Leyendo"))
+    snapshot.save(MENU_CACHE)
+    st.session_state['MENU_SNAPSHOT'] = snapshot
+    st.success(f"✅ {len(snapshot)} elementos en {(time.monotonic() - start) * 1000:.0f} ms")
+    if errors:
+        st.warning("Sin respuesta: " + ", ".join(errors[:10]))
+
+if snapshot is None:
+    st.info("Aún no hay foto del menú. Presiona **Leer menú del radio**.")
+    st.stop()
+
+read_at = time.strftime("%Y-%m-%d %H:%M", time.localtime(snapshot.read_at)) if snapshot.read_at else "?"
+st.markdown(f"**Última lectura:** {read_at}")
+
+with st.form("save_profile"):
+    name = st.text_input("Nombre del perfil", value=snapshot.name or "perfil")
+    if st.form_submit_button("Preparar descarga"):
+        snapshot.name = name
+if snapshot.name:
+    st.download_button("💾 Descargar perfil", snapshot.to_json(),
+                       file_name=f"menu_{snapshot.name}.json", mime="application/json")
+
+st.subheader("Aplicar perfil")
+uploaded = st.file_uploader("Perfil de menú (.json)", type="json")
+profile = None
+if uploaded is not None:
+    try:
+        profile = MenuSnapshot.from_json(uploaded.getvalue().decode())
+    except ValueError as e:
+        st.error(f"❌ Perfil inválido: {e}")
+if profile is not None:
+    pending = snapshot.diff(profile)
+    st.write(f"Perfil **{profile.name or '?'}**: {len(pending)} elementos distintos a la última lectura")
+    if st.button("📤 Aplicar perfil", type="primary"):
+        bar = st.progress(0.0)
+        start = time.monotonic()
+        written, errors, live = restore_menu(sched, profile, progress=show_progress(bar, "Escribiendo"))
+        for key, item in live.items.items():
+            snapshot.items[key] = item
+        snapshot.save(MENU_CACHE)
+        st.success(f"✅ {len(written)} elementos escritos en {(time.monotonic() - start) * 1000:.0f} ms")
+        if errors:
+            st.error("Fallaron: " + ", ".join(errors[:10]))
+
+st.dataframe(snapshot.rows(profile), hide_index=True, use_container_width=True)
@@ -0,0 +1 @@
+from .cat import CatTransport, CatError, CatTimeout
@@ -0,0 +1,119 @@
+import json
+import os
+import time
+
+from .cat import CatError
+
+# ----------- DETECCIÓN Y NEGOCIACIÓN DE LA VELOCIDAD DEL PUERTO -----------
+# El radio contesta 'ID019;' a 'ID;' solo si el puerto está a la misma
+# velocidad que su menú 56 (conector COM). Para detectar se prueba cada
+# velocidad empezando por la última que funcionó. Para negociar se cambia el
+# menú 56, se mueve el puerto a la nueva velocidad y se verifica con varias
+# consultas; si no es estable se vuelve a detectar y se prueba la siguiente.
+# Lo elegido queda en LINK_FILE por puerto, así el siguiente arranque no
+# tiene que probar nada.
+
+BAUD_RATES = (4800, 9600, 19200, 38400, 57600)   # índice = valor del menú 56
+BAUD_MENU = '0560000'
+LINK_FILE = "conexion_ts2000.json"
+PROBE_TIMEOUT = 0.25    # s por intento de ID
+PROBE_TRIES = 2
+STABLE_CHECKS = 20      # consultas seguidas sin error para aceptar una velocidad
+THROUGHPUT_BATCH = ['IF;', 'FA;', 'FB;', 'SM0;']
+
+
+def _identify(cat):
+    try:
+        return cat.query('ID;', PROBE_TIMEOUT).startswith('ID')
+    except CatError:
+        return False
+
+
+def _switch_port(cat, baudrate):
+    cat.ser.baudrate = baudrate
+    cat.flush()
+
+
+def detect_baud(cat, rates=BAUD_RATES, first=None):
+    # Deja el puerto a la velocidad del radio y la regresa; None si no contesta
+    order = [first] if first in rates else []
+    order += [r for r in sorted(rates, key=lambda r: (r != 9600, r)) if r not in order]
+    original = cat.ser.baudrate
+    with cat.lock:
+        for rate in order:
+            _switch_port(cat, rate)
+            # Un ';' suelto descarta lo que el radio haya acumulado de basura
+            cat.write(';')
+            for _ in range(PROBE_TRIES):
+                if _identify(cat):
+                    return rate
+        _switch_port(cat, original)
+    return None
+
+
+def measure_throughput(cat, seconds=1.0):
+    # Ráfagas del sondeo normal durante `seconds`: (comandos/s, bytes/s, errores)
+    start = time.monotonic()
+    bytes_start = cat.stats.bytes_in + cat.stats.bytes_out
+    commands = errors = 0
+    while time.monotonic() - start < seconds:
+        replies = cat.batch(THROUGHPUT_BATCH)
+        commands += len(replies)
+        errors += sum(isinstance(r, Exception) for r in replies.values())
+    elapsed = time.monotonic() - start
+    moved = cat.stats.bytes_in + cat.stats.bytes_out - bytes_start
+    return commands / elapsed, moved / elapsed, errors
+
+
+def _stable(cat):
+    for _ in range(STABLE_CHECKS):
+        if any(isinstance(r, Exception) for r in cat.batch(THROUGHPUT_BATCH, PROBE_TIMEOUT).values()):
+            return False
+    return True
+
+
+def negotiate_baud(cat, current, rates=BAUD_RATES, log=None):
+    # Sube radio y puerto a la velocidad estable más alta. Regresa la velocidad
+    # final (la de arranque si ninguna más alta fue estable).
+    log = log or (lambda msg: None)
+    with cat.lock:
+        for rate in sorted((r for r in rates if r > current), reverse=True):
+            cat.command(f"EX{BAUD_MENU}{rates.index(rate)};")
+            time.sleep(0.1)     # el radio reconfigura su UART después de contestar
+            _switch_port(cat, rate)
+            if _identify(cat) and _stable(cat):
+                log(f"{rate} baudios: estable")
+                return rate
+            log(f"{rate} baudios: inestable")
+            # No se sabe si el radio aplicó el cambio; se busca dónde quedó
+            found = detect_baud(cat, rates, first=current)
+            if found is None:
+                raise CatError("Se perdió la comunicación con el radio al cambiar la velocidad")
+            if found != current:
+                cat.command(f"EX{BAUD_MENU}{rates.index(current)};")
+                time.sleep(0.1)
+                _switch_port(cat, current)
+    return current
+
+
+# --- configuración recordada por puerto ---
+def load_link_settings(port, path=LINK_FILE):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f).get(port)
+    except (OSError, ValueError):
+        return None
+
+
+def save_link_settings(port, settings, path=LINK_FILE):
+    try:
+        with open(path, encoding="utf-8") as f:
+            saved = json.load(f)
+    except (OSError, ValueError):
+        saved = {}
+    # Se combina con lo que ya había (p. ej. la velocidad no borra DTR/RTS)
+    saved[port] = dict(saved.get(port, {}), **settings, saved_at=time.time())
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(saved, f, indent=1)
+    os.replace(tmp, path)
@@ -0,0 +1,205 @@
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+
+import serial
+
+from .cat import CatError, CatTransport
+from .poller import RigPoller
+from .rig import read_batch
+from .scheduler import CommandScheduler
+from .sim import DEFAULT_LATENCY, SimulatedTS2000
+
+# ----------- BENCHMARK DEL CICLO DE SONDEO -----------
+# Mide la pila real (CatTransport, read_batch, CommandScheduler, RigPoller)
+# contra el radio simulado o contra un puerto real:
+#
+#     python -m ts2000.bench                      # simulador, todas las velocidades
+#     python -m ts2000.bench --port /dev/ttyUSB0 --baud 9600
+#
+# Guarda los resultados en JSON para comparar entre versiones.
+
+BAUD_RATES = [4800, 9600, 19200, 38400, 57600]
+COMMANDS = ['FA;', 'FB;', 'IF;', 'OI;', 'MD;', 'SM0;']
+REFRESH_BATCH = ['IF;', 'FA;', 'FB;', 'SM0;']     # todos los campos del poller en una ráfaga
+VIEWERS = [1, 5, 20]
+VIEWER_INTERVAL = 0.1   # cada "navegador" lee la foto a 10 Hz
+
+
+def percentiles(samples):
+    # p50/p95/p99 en milisegundos
+    if not samples:
+        return None
+    ms = [s * 1000 for s in samples]
+    if len(ms) == 1:
+        return {'n': 1, 'p50': ms[0], 'p95': ms[0], 'p99': ms[0], 'max': ms[0]}
+    q = statistics.quantiles(ms, n=100, method='inclusive')
+    return {'n': len(ms), 'p50': q[49], 'p95': q[94], 'p99': q[98], 'max': max(ms)}
+
+
+@contextmanager
+def open_radio(args, baud):
+    # Puerto real si se indicó --port; si no, un TS-2000 simulado a `baud`
+    if args.port:
+        ser = serial.Serial(args.port, baud)
+        try:
+            yield CatTransport(ser), None
+        finally:
+            ser.close()
+        return
+    with SimulatedTS2000(baudrate=baud, latency=args.latency) as sim:
+        ser = serial.Serial(sim.port, baud)
+        try:
+            yield CatTransport(ser), sim
+        finally:
+            ser.close()
+
+
+def bench_commands(cat, iterations):
+    # Ida y vuelta de cada consulta por separado
+    results = {}
+    for cmd in COMMANDS:
+        samples, errors = [], 0
+        for _ in range(iterations):
+            start = time.perf_counter()
+            try:
+                cat.query(cmd)
+                samples.append(time.perf_counter() - start)
+            except CatError:
+                errors += 1
+        results[cmd.rstrip(';')] = dict(percentiles(samples) or {}, errors=errors)
+    return results
+
+
+def bench_cycle(cat, iterations):
+    # Un refresco completo del display: una sola ráfaga IF;FA;FB;SM0;
+    samples, errors = [], 0
+    for _ in range(iterations):
+        start = time.perf_counter()
+        _, errs = read_batch(cat, REFRESH_BATCH)
+        samples.append(time.perf_counter() - start)
+        errors += len(errs)
+    return dict(percentiles(samples), errors=errors)
+
+
+def bench_throughput(cat, duration):
+    # Comandos por segundo sostenidos con ráfagas consecutivas
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < duration:
+        values, _ = read_batch(cat, REFRESH_BATCH)
+        count += len(values)
+    return count / (time.perf_counter() - start)
+
+
+def bench_viewers(cat, sim, viewers, duration):
+    # N "navegadores" leen la foto del poller mientras un operador escribe;
+    # el tráfico serie debe ser el mismo sin importar N
+    scheduler = CommandScheduler(cat)
+    scheduler.start()
+    poller = RigPoller(scheduler)
+    poller.start()
+    time.sleep(0.5)
+
+    stop = threading.Event()
+    ages, reads = [], [0]
+    lock = threading.Lock()
+
+    def viewer():
+        while not stop.is_set():
+            age = poller.snapshot().age()
+            with lock:
+                reads[0] += 1
+                if age is not None:
+                    ages.append(age)
+            stop.wait(VIEWER_INTERVAL)
+
+    threads = [threading.Thread(target=viewer, daemon=True) for _ in range(viewers)]
+    commands_before = sim.commands if sim else None
+    for t in threads:
+        t.start()
+
+    writes = []
+    start = time.perf_counter()
+    freq = 14_000_000
+    while time.perf_counter() - start < duration:
+        freq += 100
+        t0 = time.perf_counter()
+        scheduler.set(f"FA{freq:011d};").result(timeout=5)
+        writes.append(time.perf_counter() - t0)
+        time.sleep(0.2)
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    for t in threads:
+        t.join()
+    poller.stop()
+    scheduler.stop()
+    return {
+        'viewers': viewers,
+        'snapshot_reads': reads[0],
+        'snapshot_age': percentiles(ages),
+        'control_write': percentiles(writes),
+        'serial_commands_per_s': (sim.commands - commands_before) / elapsed if sim else None,
+    }
+
+
+def git_version():
+    try:
+        return subprocess.check_output(['git', 'describe', '--always', '--dirty'],
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del ciclo de sondeo CAT")
+    parser.add_argument("--port", default=None, help="puerto real; por omisión usa el simulador")
+    parser.add_argument("--baud", type=int, default=None, help="solo esta velocidad")
+    parser.add_argument("--latency", type=float, default=DEFAULT_LATENCY, help="latencia del simulador (s)")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=3.0, help="segundos por prueba de carga")
+    parser.add_argument("--output", default="bench_results.json")
+    args = parser.parse_args()
+
+    bauds = [args.baud] if args.baud else ([9600] if args.port else BAUD_RATES)
+    report = {
+        'version': git_version(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'radio': args.port or 'simulador',
+        'sim_latency': None if args.port else args.latency,
+        'baud': {},
+    }
+    for baud in bauds:
+        print(f"--- {baud} baudios")
+        with open_radio(args, baud) as (cat, sim):
+            entry = {
+                'commands': bench_commands(cat, args.iterations),
+                'refresh_cycle': bench_cycle(cat, args.iterations),
+                'commands_per_s': bench_throughput(cat, args.duration),
+            }
+            print(f"  ciclo p50={entry['refresh_cycle']['p50']:.1f} ms  "
+                  f"p95={entry['refresh_cycle']['p95']:.1f} ms  "
+                  f"{entry['commands_per_s']:.0f} cmd/s")
+            entry['viewers'] = []
+            for n in VIEWERS:
+                result = bench_viewers(cat, sim, n, args.duration)
+                entry['viewers'].append(result)
+                cps = result['serial_commands_per_s']
+                print(f"  {n:>2} visores: escritura p95={result['control_write']['p95']:.1f} ms"
+                      + (f"  {cps:.1f} cmd/s en el bus" if cps is not None else ""))
+            report['baud'][str(baud)] = entry
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Resultados en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
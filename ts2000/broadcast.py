@@ -0,0 +1,141 @@
+import ipaddress
+import json
+import socket
+import threading
+import time
+from xml.sax.saxutils import escape
+
+# ----------- DIFUSIÓN UDP DE LOS CAMBIOS DEL RADIO -----------
+# Loggers, pantallas y panadaptadores que solo necesitan *enterarse* de la
+# frecuencia y el modo reciben un datagrama por cambio, en JSON compacto o en
+# el XML RadioInfo de N1MM. El hilo espera los cambios del poller (no
+# consulta nada), así que cualquier número de oyentes no agrega tráfico serie.
+# Los cambios que llegan más rápido que MAX_RATE se juntan en uno solo con el
+# último estado, y cada HEARTBEAT s se repite el estado para los oyentes que
+# se acaban de conectar.
+#
+# La dirección puede ser unicast (127.0.0.1), broadcast (255.255.255.255 o la
+# de la subred) o multicast (239.x.x.x, con TTL configurable).
+
+BROADCAST_HOST = "127.0.0.1"
+BROADCAST_PORT = 12060          # el puerto de RadioInfo de N1MM
+MAX_RATE = 10.0                 # datagramas por segundo como máximo
+HEARTBEAT = 5.0
+FIELDS = ('vfo_a', 'vfo_b', 'mode_a', 'mode_b', 'active_vfo', 'tx', 'split')
+
+
+def state_fields(rig, smeter=False):
+    fields = {k: getattr(rig, k) for k in FIELDS}
+    if smeter:
+        fields['smeter'] = rig.smeter
+    return fields
+
+
+def json_datagram(fields):
+    return json.dumps(dict(fields, t=round(time.time(), 3)), separators=(',', ':')).encode()
+
+
+def n1mm_datagram(fields, station="TS2000", radio=1):
+    # RadioInfo de N1MM: frecuencias en decenas de Hz
+    rx_vfo = 'b' if fields['active_vfo'] == 'B' else 'a'
+    tx_vfo = ('a' if rx_vfo == 'b' else 'b') if fields['split'] else rx_vfo
+    rx = fields[f"vfo_{rx_vfo}"] or 0
+    tx = fields[f"vfo_{tx_vfo}"] or 0
+    return (
+        '<?xml version="1.0" encoding="utf-8"?>\n<RadioInfo>'
+        f"<StationName>{escape(station)}</StationName><RadioNr>{radio}</RadioNr>"
+        f"<Freq>{rx // 10}</Freq><TXFreq>{tx // 10}</TXFreq>"
+        f"<Mode>{escape(fields[f'mode_{rx_vfo}'] or '')}</Mode>"
+        f"<IsTransmitting>{fields['tx']}</IsTransmitting><IsSplit>{fields['split']}</IsSplit>"
+        f"<ActiveRadioNr>{radio}</ActiveRadioNr></RadioInfo>"
+    ).encode()
+
+
+FORMATS = {'json': json_datagram, 'n1mm': n1mm_datagram}
+
+
+class StateBroadcaster:
+    def __init__(self, poller, host=BROADCAST_HOST, port=BROADCAST_PORT, fmt='json',
+                 max_rate=MAX_RATE, ttl=1, smeter=False):
+        if fmt not in FORMATS:
+            raise ValueError(f"Formato desconocido: {fmt}")
+        self.poller = poller
+        self.address = (host, port)
+        self.fmt = fmt
+        self.max_rate = max_rate
+        self.ttl = ttl
+        self.smeter = smeter        # el S-meter cambia casi siempre; por omisión no cuenta
+        self.sent = 0
+        self._sock = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _open_socket(self):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        addr = ipaddress.ip_address(socket.gethostbyname(self.address[0]))
+        if addr.is_multicast:
+            sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, self.ttl)
+        else:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+        return sock
+
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def configure(self, host, port, fmt):
+        # Cambia destino o formato; si estaba corriendo sigue con lo nuevo
+        if fmt not in FORMATS:
+            raise ValueError(f"Formato desconocido: {fmt}")
+        if (host, port) == self.address and fmt == self.fmt:
+            return self
+        was_running = self.running()
+        self.stop()
+        self.address, self.fmt = (host, port), fmt
+        return self.start() if was_running else self
+
+    def start(self):
+        # Lanza OSError si la dirección no es válida
+        if self.running():
+            return self
+        self._sock = self._open_socket()
+        # Un evento por hilo: uno viejo que aún no despierta no revive con start()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(self._stop,), name="udp-broadcast", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            # Puede estar esperando un cambio hasta HEARTBEAT s; como es daemon
+            # no hace falta esperarlo, ya no va a mandar nada
+            self._thread.join(timeout=0.5)
+            self._thread = None
+        if self._sock:
+            self._sock.close()
+            self._sock = None
+
+    def _send(self, fields):
+        try:
+            self._sock.sendto(FORMATS[self.fmt](fields), self.address)
+            self.sent += 1
+        except OSError:
+            pass    # sin red o nadie escuchando en unicast: no es un error nuestro
+
+    def _run(self, stop):
+        version, last, last_sent = -1, None, 0.0
+        min_interval = 1.0 / self.max_rate
+        while not stop.is_set():
+            # Respeta el intervalo mínimo; lo que cambie mientras tanto se junta
+            # y sale en el siguiente datagrama con el estado más reciente
+            wait = min_interval - (time.monotonic() - last_sent)
+            if wait > 0 and stop.wait(wait):
+                break
+            version, rig = self.poller.wait_for_change(version, HEARTBEAT)
+            if stop.is_set():
+                break
+            fields = state_fields(rig, self.smeter)
+            if fields == last and time.monotonic() - last_sent < HEARTBEAT:
+                continue    # cambió algo que no se difunde (el S-meter)
+            self._send(fields)
+            last, last_sent = fields, time.monotonic()
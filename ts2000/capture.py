@@ -0,0 +1,264 @@
+import argparse
+import json
+import threading
+import time
+
+import numpy as np
+
+# ----------- CAPTURA DEL TRÁFICO CAT Y PUERTO DE REPRODUCCIÓN -----------
+# CaptureRing guarda cada bloque de bytes escrito o leído por el transporte
+# con su marca de tiempo monotónica, en memoria reservada una sola vez: los
+# bytes van a un bytearray circular y cada evento (tiempo, dirección,
+# posición, longitud) a arreglos de NumPy, como el buffer del S-meter. Grabar
+# es una copia de memoria y cuatro asignaciones bajo un lock, así que puede
+# quedarse encendido siempre. Al pedirlo se vuelca a un archivo JSON lines.
+#
+# ReplaySerial se hace pasar por serial.Serial y vuelve a contestar lo que
+# el radio contestó en la captura: cada comando escrito recibe la respuesta
+# que ese comando tuvo, aunque el cliente no repita las escrituras byte por
+# byte ni en el mismo orden. Así se puede repetir, sin radio, la respuesta
+# que produjo un IF truncado o un '?;' inesperado.
+#
+#     python -m ts2000.capture captura.jsonl      # línea de tiempo legible
+
+TX = 0
+RX = 1
+DATA_CAPACITY = 1 << 20     # 1 MiB de bytes
+EVENT_CAPACITY = 1 << 16
+CAPTURE_VERSION = 1
+
+
+class CaptureRing:
+    def __init__(self, data_capacity=DATA_CAPACITY, event_capacity=EVENT_CAPACITY):
+        self.data = bytearray(data_capacity)
+        self.times = np.zeros(event_capacity, dtype=np.float64)
+        self.dirs = np.zeros(event_capacity, dtype=np.int8)
+        self.offsets = np.zeros(event_capacity, dtype=np.int64)    # posición absoluta en el flujo
+        self.lengths = np.zeros(event_capacity, dtype=np.int32)
+        self.enabled = True
+        self._written = 0       # bytes grabados desde el inicio
+        self._head = 0          # siguiente evento
+        self._count = 0
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.started_mono = time.monotonic()
+
+    def __len__(self):
+        return self._count
+
+    def record(self, direction, chunk):
+        if not self.enabled or not chunk:
+            return
+        n = len(chunk)
+        cap = len(self.data)
+        with self._lock:
+            if n > cap:     # más grande que todo el buffer: se queda la cola
+                chunk, n = chunk[-cap:], cap
+            start = self._written % cap
+            first = min(n, cap - start)
+            self.data[start:start + first] = chunk[:first]
+            if first < n:
+                self.data[:n - first] = chunk[first:]
+            i = self._head
+            self.times[i] = time.monotonic()
+            self.dirs[i] = direction
+            self.offsets[i] = self._written
+            self.lengths[i] = n
+            self._written += n
+            self._head = (i + 1) % len(self.times)
+            if self._count < len(self.times):
+                self._count += 1
+
+    def clear(self):
+        with self._lock:
+            self._head = self._count = 0
+
+    def events(self):
+        # [(t monotónico, dirección, bytes)] en orden, solo los que siguen en el buffer
+        with self._lock:
+            n, cap = self._count, len(self.data)
+            order = (np.arange(self._head - n, self._head) % len(self.times))
+            oldest_valid = self._written - cap
+            out = []
+            for i in order:
+                off, length = int(self.offsets[i]), int(self.lengths[i])
+                if off < oldest_valid:
+                    continue    # sus bytes ya se sobrescribieron
+                start = off % cap
+                if start + length <= cap:
+                    chunk = bytes(self.data[start:start + length])
+                else:
+                    chunk = bytes(self.data[start:]) + bytes(self.data[:length - (cap - start)])
+                out.append((float(self.times[i]), int(self.dirs[i]), chunk))
+            return out
+
+    def dumps(self, meta=None):
+        # Texto JSON lines: encabezado y un evento por línea (tiempo relativo al primero)
+        events = self.events()
+        t0 = events[0][0] if events else self.started_mono
+        header = dict(meta or {}, version=CAPTURE_VERSION,
+                      started=self.started + (t0 - self.started_mono), events=len(events))
+        lines = [json.dumps(header)]
+        lines += [json.dumps({'t': round(t - t0, 6), 'dir': 'tx' if d == TX else 'rx', 'data': c.hex()})
+                  for t, d, c in events]
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path, meta=None):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.dumps(meta))
+
+
+def load_capture(text):
+    # (encabezado, [(t, dirección, bytes)]) de lo que produjo dumps()
+    lines = [line for line in text.splitlines() if line.strip()]
+    if not lines:
+        raise ValueError("Captura vacía")
+    header = json.loads(lines[0])
+    if header.get('version') != CAPTURE_VERSION:
+        raise ValueError("Versión de captura no soportada")
+    events = []
+    for line in lines[1:]:
+        e = json.loads(line)
+        events.append((e['t'], TX if e['dir'] == 'tx' else RX, bytes.fromhex(e['data'])))
+    return header, events
+
+
+def pair_replies(events):
+    # Parte el tráfico en comandos y tramas y asocia cada respuesta con el
+    # comando que la pidió, como lo hace CatTransport.batch(): el transporte
+    # hace un intercambio a la vez, así que solo cuentan los comandos del
+    # último bloque escrito; la trama va al más antiguo cuyo texto es su
+    # prefijo ('SM0' -> 'SM00015') y un '?' al más antiguo de todos. Regresa [(t, trama con ';', comando o
+    # None si nadie la pidió, t del comando)] en orden de llegada.
+    frames, pending, rx_buf = [], [], b''
+    for t, direction, chunk in events:
+        if direction == TX:
+            pending = [(cmd, t) for cmd in chunk.decode('ascii', 'replace').split(';')[:-1] if cmd]
+            continue
+        rx_buf += chunk
+        *complete, rx_buf = rx_buf.split(b';')
+        for raw in complete:
+            frame = raw.decode('ascii', 'replace').strip()
+            if not frame:
+                continue
+            if frame == '?':
+                match = 0 if pending else None
+            else:
+                match = next((i for i, (cmd, _) in enumerate(pending) if frame.startswith(cmd)), None)
+            cmd, sent = pending.pop(match) if match is not None else (None, t)
+            frames.append((t, frame.encode() + b';', cmd, sent))
+    return frames
+
+
+class ReplaySerial:
+    # Sustituto de serial.Serial que contesta con las respuestas de una captura.
+    # Cada comando escrito recibe la siguiente respuesta que ese mismo comando
+    # tuvo en la captura, sin importar el orden ni cómo iban agrupados (la app
+    # manda 'AI2;' y luego ráfagas 'IF;FA;FB;OI;SM0;'; un script puede pedir
+    # solo 'IF;'). Las tramas que nadie pidió (AI) salen junto con la primera
+    # respuesta que las sigue. Si ya se usaron todas las respuestas de un
+    # comando se repite la última; un comando que nunca tuvo respuesta (una
+    # escritura como 'FA00014250000;') no recibe nada, igual que con el radio.
+    def __init__(self, events, realtime=False, baudrate=9600, port="captura"):
+        self.frames = pair_replies(events)
+        self.realtime = realtime    # respetar la demora de cada respuesta en la captura
+        self.baudrate = baudrate
+        self.port = port
+        self.timeout = 1
+        self.dtr = self.rts = False
+        self.is_open = True
+        self.unmatched = []         # comandos escritos sin respuesta en la captura
+        self._used = [False] * len(self.frames)
+        self._pos = 0               # primera trama sin usar
+        self._last = {}             # comando -> índice de su última respuesta entregada
+        self._rx = bytearray()
+        self._release_at = []       # (instante monotónico, bytes) aún no liberados
+        self._tx_pending = ''
+        self._cancel = threading.Event()
+
+    def _release(self, i, now):
+        t, frame, _, sent = self.frames[i]
+        if self.realtime:
+            self._release_at.append((now + max(0.0, t - sent), frame))
+        else:
+            self._rx += frame
+
+    def _answer(self, cmd, now):
+        j = next((i for i in range(self._pos, len(self.frames))
+                  if not self._used[i] and self.frames[i][2] == cmd), None)
+        if j is None:
+            if cmd in self._last:
+                self._release(self._last[cmd], now)
+            else:
+                self.unmatched.append(cmd)
+            return
+        for i in range(self._pos, j + 1):
+            if not self._used[i] and (i == j or self.frames[i][2] is None):
+                self._used[i] = True
+                self._release(i, now)
+        self._last[cmd] = j
+        while self._pos < len(self.frames) and self._used[self._pos]:
+            self._pos += 1
+
+    def _due(self):
+        if self._release_at:
+            now = time.monotonic()
+            while self._release_at and self._release_at[0][0] <= now:
+                self._rx += self._release_at.pop(0)[1]
+
+    def finished(self):
+        return self._pos >= len(self.frames) and not self._rx and not self._release_at
+
+    # --- interfaz de serial.Serial que usa CatTransport ---
+    @property
+    def in_waiting(self):
+        self._due()
+        return len(self._rx)
+
+    def write(self, data):
+        # Contesta cada comando completo de lo escrito
+        self._tx_pending += data.decode('ascii', 'replace')
+        *cmds, self._tx_pending = self._tx_pending.split(';')
+        now = time.monotonic()
+        for cmd in cmds:
+            if cmd:
+                self._answer(cmd, now)
+        return len(data)
+
+    def read(self, size=1):
+        deadline = time.monotonic() + (self.timeout or 0)
+        self._cancel.clear()
+        while True:
+            self._due()
+            if self._rx:
+                chunk = bytes(self._rx[:size])
+                del self._rx[:size]
+                return chunk
+            if time.monotonic() >= deadline or self._cancel.is_set():
+                return b''
+            time.sleep(0.001)
+
+    def reset_input_buffer(self):
+        self._rx.clear()
+
+    def cancel_read(self):
+        self._cancel.set()
+
+    def close(self):
+        self.is_open = False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Muestra una captura CAT como línea de tiempo")
+    parser.add_argument("path")
+    args = parser.parse_args()
+    with open(args.path, encoding="utf-8") as f:
+        header, events = load_capture(f.read())
+    print(json.dumps(header))
+    for t, direction, chunk in events:
+        arrow = "→" if direction == TX else "←"
+        print(f"{t:10.4f} {arrow} {chunk.decode(errors='backslashreplace')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+import threading
+import time
+
+from .capture import RX, TX
+from .frames import FrameParser
+from .stats import CatStats
+
+# ----------- TRANSPORTE CAT (LECTURA POR TERMINADOR ';') -----------
+# Cada respuesta del TS-2000 termina en ';'. En lugar de dormir un tiempo fijo
+# y luego leer todo lo que haya llegado, leemos hasta recibir la trama que
+# esperamos o hasta que vence el plazo del comando.
+#
+# Con Auto-Information (AI) activo el radio también envía tramas que nadie
+# pidió (FA/FB/IF/MD al girar el dial). Por eso ya no se vacía el buffer de
+# entrada antes de cada comando: toda trama recibida se entrega a los
+# "listeners" y a los handlers de su prefijo (ver frames.py), y la respuesta
+# esperada se reconoce por su prefijo.
+
+DEFAULT_TIMEOUT = 0.5     # plazo por comando (s)
+READ_SLICE = 0.02         # timeout de cada read() individual (s)
+ERROR_WINDOW = 0.05       # tiempo que esperamos un '?;' tras un comando de escritura
+
+
+class CatError(Exception):
+    pass
+
+
+class CatTimeout(CatError):
+    pass
+
+
+class CatTransport:
+    def __init__(self, ser, timeout=DEFAULT_TIMEOUT, capture=None):
+        self.ser = ser
+        self.timeout = timeout
+        self.capture = capture  # CaptureRing opcional: graba cada byte escrito y leído
+        self.parser = FrameParser()
+        self.write_listeners = []
+        self.stats = CatStats()
+        self.failed = None      # última excepción del puerto (adaptador USB desconectado...)
+        # Un solo intercambio comando/respuesta a la vez (poller + páginas)
+        self.lock = threading.RLock()
+        # Lecturas cortas: read() regresa en cuanto hay bytes o a los READ_SLICE s
+        self.ser.timeout = READ_SLICE
+
+    def add_listener(self, fn):
+        # fn(frame) se llama con cada trama recibida (sin ';'), pedida o no
+        self.parser.add_listener(fn)
+
+    def remove_listener(self, fn):
+        self.parser.remove_listener(fn)
+
+    def add_handler(self, prefix, fn):
+        # fn(valor, frame) con cada trama bien formada de ese prefijo ('FA',
+        # 'IF', 'SM'...), con el valor ya decodificado por parse_frame
+        self.parser.add_handler(prefix, fn)
+
+    def remove_handler(self, prefix, fn):
+        self.parser.remove_handler(prefix, fn)
+
+    def add_write_listener(self, fn):
+        # fn(cmd) se llama con cada comando enviado (sin ';'); sirve para
+        # llevar un estado "sombra" de lo que nosotros mismos escribimos
+        if fn not in self.write_listeners:
+            self.write_listeners.append(fn)
+
+    def remove_write_listener(self, fn):
+        if fn in self.write_listeners:
+            self.write_listeners.remove(fn)
+
+    def _fill(self, deadline):
+        # Lee lo disponible (mínimo 1 byte) sin pasarse del plazo
+        if time.monotonic() >= deadline:
+            return False
+        try:
+            chunk = self.ser.read(self.ser.in_waiting or 1)
+        except OSError as e:    # SerialException también es OSError
+            self._port_lost(e)
+        if chunk:
+            self.stats.bytes_in += len(chunk)
+            self.parser.feed(chunk)
+            if self.capture is not None:
+                self.capture.record(RX, chunk)
+            return True
+        return False
+
+    def _port_lost(self, e):
+        self.failed = e
+        raise CatError(f"Se perdió el puerto: {e}") from e
+
+    def swap_port(self, ser):
+        # Cambia el puerto por otro ya abierto cuando termina el intercambio en
+        # curso; regresa el anterior para que el llamador lo cierre o lo guarde
+        with self.lock:
+            old, self.ser = self.ser, ser
+            ser.timeout = READ_SLICE
+            self.parser.clear()
+            self.failed = None
+        return old
+
+    def read_frame(self, deadline):
+        # Devuelve la siguiente trama completa (sin ';') o None si vence el plazo
+        while True:
+            frame = self.parser.next_frame()
+            if frame is not None:
+                return frame
+            if time.monotonic() >= deadline:
+                return None
+            self._fill(deadline)
+
+    def drain(self):
+        # Procesa lo que ya está en el puerto sin esperar más datos
+        with self.lock:
+            try:
+                waiting = self.ser.in_waiting
+                chunk = self.ser.read(waiting) if waiting else b''
+            except OSError as e:
+                self._port_lost(e)
+            if chunk:
+                self.stats.bytes_in += len(chunk)
+                self.parser.feed(chunk)
+                if self.capture is not None:
+                    self.capture.record(RX, chunk)
+            while self.parser.next_frame() is not None:
+                pass
+
+    def pump(self, duration):
+        # Escucha tramas no solicitadas durante `duration` segundos. El lock se
+        # toma por rebanadas de READ_SLICE para no bloquear a otros comandos.
+        # Regresa antes si una lectura vuelve vacía (timeout o cancel_read()).
+        deadline = time.monotonic() + duration
+        while time.monotonic() < deadline:
+            with self.lock:
+                got = self._fill(deadline)
+                while self.parser.next_frame() is not None:
+                    pass
+            if not got:
+                return
+
+    def flush(self):
+        self.ser.reset_input_buffer()
+        self.parser.clear()
+
+    def write(self, cmd):
+        if not cmd.endswith(';'):
+            cmd += ';'
+        data = cmd.encode()
+        try:
+            self.ser.write(data)
+        except OSError as e:
+            self._port_lost(e)
+        self.stats.bytes_out += len(data)
+        if self.capture is not None:
+            self.capture.record(TX, data)
+        for fn in list(self.write_listeners):
+            for part in cmd.split(';')[:-1]:
+                try:
+                    fn(part)
+                except Exception:
+                    pass
+
+    def _exchange(self, cmd, timeout, expect_reply=True):
+        # Regresa la trama con el prefijo del comando, '?' o None si vence el plazo
+        prefix = cmd.rstrip(';')[:2]
+        with self.lock:
+            deadline = time.monotonic() + timeout
+            self.drain()
+            start = time.perf_counter()
+            self.write(cmd)
+            while True:
+                frame = self.read_frame(deadline)
+                if frame is None or frame == '?' or frame.startswith(prefix):
+                    break
+        self.stats.record(
+            prefix,
+            latency=time.perf_counter() - start if frame not in (None, '?') else None,
+            error=frame == '?',
+            timeout=frame is None and expect_reply,
+        )
+        return frame
+
+    def query(self, cmd, timeout=None):
+        # Envía una consulta (p. ej. 'FA;') y regresa la trama que empieza con
+        # el mismo prefijo. Lanza CatError si el radio responde '?;' y
+        # CatTimeout si no llega respuesta a tiempo.
+        frame = self._exchange(cmd, self.timeout if timeout is None else timeout)
+        if frame is None:
+            raise CatTimeout(f"Sin respuesta a {cmd}")
+        if frame == '?':
+            raise CatError(f"El radio rechazó {cmd}")
+        return frame
+
+    def command(self, cmd, timeout=None):
+        # Comando genérico: regresa la respuesta (o '?') o None.
+        # Para comandos de escritura (sin respuesta) solo esperamos un posible '?;'.
+        if timeout is None:
+            return self._exchange(cmd, ERROR_WINDOW, expect_reply=False)
+        return self._exchange(cmd, timeout)
+
+    def set(self, cmd):
+        # Comando de escritura: lanza CatError si el radio responde '?;'
+        if self.command(cmd) == '?':
+            raise CatError(f"El radio rechazó {cmd}")
+
+    def batch(self, cmds, timeout=None, setup=()):
+        # Envía varias consultas en una sola escritura ('FA;FB;IF;SM0;') y
+        # reparte las respuestas por prefijo. El radio contesta en orden, así
+        # que un '?;' corresponde a la consulta pendiente más antigua.
+        # `timeout` es el plazo por respuesta. Regresa {comando sin ';': trama}
+        # y, en lugar de la trama, un CatError/CatTimeout para las que fallaron.
+        # `setup` son comandos de escritura que van al inicio de la misma
+        # ráfaga (p. ej. sintonizar antes de medir); un '?;' suyo se cuenta
+        # como error de la primera consulta.
+        per_item = self.timeout if timeout is None else timeout
+        keys = list(dict.fromkeys(c.rstrip(';') for c in cmds))
+        pending = list(keys)
+        results = {}
+        with self.lock:
+            self.drain()
+            start = time.perf_counter()
+            self.write(''.join(c if c.endswith(';') else c + ';' for c in setup)
+                       + ''.join(k + ';' for k in keys))
+            deadline = time.monotonic() + per_item
+            while pending:
+                frame = self.read_frame(deadline)
+                if frame is None:
+                    break
+                if frame == '?':
+                    key = pending.pop(0)
+                    results[key] = CatError(f"El radio rechazó {key};")
+                    self.stats.record(key[:2], error=True)
+                else:
+                    key = next((k for k in pending if frame.startswith(k)), None)
+                    if key is None:
+                        continue  # trama no solicitada (AI), ya se entregó a los listeners
+                    pending.remove(key)
+                    results[key] = frame
+                    self.stats.record(key[:2], latency=time.perf_counter() - start)
+                deadline = time.monotonic() + per_item
+        for key in pending:
+            results[key] = CatTimeout(f"Sin respuesta a {key};")
+            self.stats.record(key[:2], timeout=True)
+        return results
@@ -0,0 +1,160 @@
+import threading
+import time
+
+import serial
+
+from .capture import CaptureRing
+from .cat import CatTransport
+
+# ----------- ADMINISTRADOR DE CONEXIONES SERIE -----------
+# Un CatTransport por puerto, que es a lo que se atan el planificador, el
+# poller y demás (por eso siguen en caché por puerto). Debajo, el manejador
+# serial.Serial se administra por (puerto, baudios, DTR, RTS):
+#
+#   - la configuración que recibe connect() solo se usa para abrir el puerto;
+#     un puerto ya abierto se queda como está, aunque otra sesión traiga otros
+#     valores. Cambiarla es configure(), que reconfigura el manejador abierto
+#     en cuanto termina el comando en curso (toma el lock del transporte); no
+#     se cierra ni se reabre nada.
+#   - otro puerto: se abre (o se reutiliza el que sigue abierto) y el anterior
+#     queda "tibio" IDLE_CLOSE segundos por si se regresa a él; luego se cierra.
+#     El puerto en uso no se cierra aunque ninguna página se reejecute (el
+#     Display en vivo no se reejecuta).
+#   - si el adaptador USB se desconecta, el transporte marca `failed` y un hilo
+#     lo reabre con espera creciente (BACKOFF) hasta que vuelva.
+#
+# Cada transporte lleva su CaptureRing (ver capture.py) con el tráfico reciente.
+
+IDLE_CLOSE = 120.0                  # s sin que ninguna página pida el puerto
+BACKOFF = (0.5, 1.0, 2.0, 5.0, 10.0)
+WATCH_INTERVAL = 0.5
+
+
+class _Link:
+    __slots__ = ('cat', 'last_used', 'parked', 'retries', 'retry_at')
+
+    def __init__(self, cat):
+        self.cat = cat
+        self.last_used = time.monotonic()
+        self.parked = False     # cerrado por inactividad: no reconectar solo
+        self.retries = 0
+        self.retry_at = 0.0
+
+
+class ConnectionManager:
+    def __init__(self, opener=None, on_open=None, idle_close=IDLE_CLOSE):
+        self.opener = opener or self._open_serial
+        self.on_open = on_open      # fn(puerto, cat) al abrir un puerto por primera vez
+        self.idle_close = idle_close
+        self.reconnects = 0
+        self.current = None         # último puerto pedido; nunca se cierra por inactividad
+        self._links = {}            # puerto -> _Link
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._watch, name="serial-watch", daemon=True)
+        self._thread.start()
+
+    @staticmethod
+    def _open_serial(port, baudrate, dtr, rts):
+        # DTR/RTS antes de abrir: pyserial los aplica al abrir e ignora los
+        # puertos que no los manejan (p. ej. el pty del simulador)
+        ser = serial.Serial(baudrate=baudrate, timeout=1)
+        ser.port = port
+        ser.dtr = dtr
+        ser.rts = rts
+        ser.open()
+        return ser
+
+    @staticmethod
+    def _settings(ser):
+        return ser.baudrate, ser.dtr, ser.rts
+
+    def connect(self, port, baudrate, dtr=False, rts=False):
+        # Transporte de `port`, abierto con esa configuración si no lo estaba.
+        # Lanza la excepción de pyserial si el puerto no se puede abrir.
+        with self._lock:
+            link = self._links.get(port)
+            if link is None:
+                link = _Link(CatTransport(self.opener(port, baudrate, dtr, rts), capture=CaptureRing()))
+                self._links[port] = link
+                new = True
+            else:
+                new = False
+                if link.parked or not link.cat.ser.is_open:
+                    link.cat.swap_port(self.opener(port, baudrate, dtr, rts))
+                    link.parked = False
+            link.last_used = time.monotonic()
+            self.current = port
+        if new and self.on_open:
+            # on_open puede cambiar los baudios a propósito (detección)
+            self.on_open(port, link.cat)
+        return link.cat
+
+    def configure(self, port, baudrate, dtr=False, rts=False):
+        # Nueva configuración elegida para `port`; si está cerrado se usará al abrirlo
+        with self._lock:
+            link = self._links.get(port)
+        if link is not None and not link.parked:
+            self.reconfigure(link.cat, baudrate, dtr, rts)
+
+    def reconfigure(self, cat, baudrate, dtr, rts):
+        if self._settings(cat.ser) == (baudrate, dtr, rts):
+            return
+        with cat.lock:      # espera a que termine el intercambio en curso
+            cat.ser.baudrate = baudrate
+            try:
+                cat.ser.dtr = dtr
+                cat.ser.rts = rts
+            except OSError:
+                pass    # el puerto no tiene líneas de control
+            cat.flush()
+
+    def ports(self):
+        with self._lock:
+            return {port: ('cerrado' if link.parked else 'error' if link.cat.failed else 'abierto')
+                    for port, link in self._links.items()}
+
+    def close(self):
+        self._stop.set()
+        self._thread.join(timeout=2)
+        with self._lock:
+            for link in self._links.values():
+                try:
+                    link.cat.ser.close()
+                except Exception:
+                    pass
+            self._links.clear()
+
+    # --- mantenimiento ---
+    def _reopen(self, port, link):
+        # El manejador caído se cierra antes de abrir el nuevo: en Windows el
+        # COM sigue ocupado ("Access is denied") mientras quede uno abierto
+        ser = link.cat.ser
+        settings = self._settings(ser)
+        try:
+            ser.close()
+        except Exception:
+            pass
+        try:
+            link.cat.swap_port(self.opener(port, *settings))
+        except Exception:
+            link.retry_at = time.monotonic() + BACKOFF[min(link.retries, len(BACKOFF) - 1)]
+            link.retries += 1
+            return
+        link.retries = 0
+        self.reconnects += 1
+
+    def _watch(self):
+        while not self._stop.wait(WATCH_INTERVAL):
+            now = time.monotonic()
+            with self._lock:
+                links = list(self._links.items())
+            for port, link in links:
+                if link.parked:
+                    continue
+                if port != self.current and now - link.last_used >= self.idle_close:
+                    with link.cat.lock:
+                        link.cat.ser.close()
+                        link.parked = True
+                elif link.cat.failed is not None and now >= link.retry_at:
+                    self._reopen(port, link)
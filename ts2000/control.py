@@ -0,0 +1,118 @@
+import threading
+
+from .rig import MODES_REV, write_mode
+from .scheduler import PRIORITY_WRITE
+
+# ----------- ESCRITURAS DEL OPERADOR: SOLO LO QUE CAMBIÓ -----------
+# Antes de escribir se compara lo pedido contra la foto del poller (que ya
+# incluye la sombra de nuestras propias escrituras) y solo se manda lo
+# distinto. El modo del VFO de recepción se cambia con MD directo; FR solo se
+# conmuta cuando el modo es del otro VFO.
+#
+# La sintonía continua (slider, botones de paso) no encola un FA/FB por cada
+# movimiento: guarda el último valor pedido y, tras DEBOUNCE sin cambios,
+# manda un solo trabajo que lee ese valor al ejecutarse. Si ya hay uno en
+# cola se reutiliza, así el radio siempre va a la última posición del dial
+# y nunca queda una fila de frecuencias viejas.
+
+DEBOUNCE = 0.05     # s sin movimiento antes de escribir
+
+
+class RigControl:
+    def __init__(self, scheduler, poller):
+        self.scheduler = scheduler
+        self.poller = poller
+        self._target = {}       # VFO -> última frecuencia pedida con tune()
+        self._timers = {}
+        self._pending = {}      # VFO -> número de tune() aún no escrito en el radio
+        self._tunes = 0
+        self._lock = threading.Lock()
+        self.sent = 0           # comandos realmente enviados
+        self.skipped = 0        # escrituras evitadas por no haber cambio
+
+    def plan(self, vfo, freq=None, mode=None):
+        # Trabajos necesarios para llevar `vfo` a (freq, mode), como
+        # [(descripción, fn(cat))]; vacío si el radio ya está así
+        state = self.poller.snapshot()
+        jobs = []
+        if freq is not None:
+            if freq != getattr(state, f"vfo_{vfo.lower()}"):
+                cmd = f"F{vfo}{freq:011d};"
+                jobs.append((cmd, lambda cat: cat.set(cmd)))
+            else:
+                self.skipped += 1
+        if mode is not None:
+            if mode != getattr(state, f"mode_{vfo.lower()}"):
+                code, rx_vfo = MODES_REV[mode], state.active_vfo
+                jobs.append((f"MD{code};", lambda cat: write_mode(cat, vfo, code, rx_vfo)))
+            else:
+                self.skipped += 1
+        return jobs
+
+    def apply(self, vfo, freq=None, mode=None):
+        # Regresa los Futures de lo que sí se mandó
+        self.poller.mark_activity()
+        futures = []
+        for _, fn in self.plan(vfo, freq, mode):
+            futures.append(self.scheduler.submit(fn, PRIORITY_WRITE))
+            self.sent += 1
+        return futures
+
+    # --- sintonía continua ---
+    def target(self, vfo):
+        with self._lock:
+            return self._target.get(vfo)
+
+    def tune(self, vfo, freq):
+        self.poller.mark_activity()
+        with self._lock:
+            self._target[vfo] = freq
+            self._tunes += 1
+            self._pending[vfo] = self._tunes
+            timer = self._timers.get(vfo)
+            if timer is not None:
+                timer.cancel()
+            timer = threading.Timer(DEBOUNCE, self._flush, args=(vfo,))
+            timer.daemon = True
+            self._timers[vfo] = timer
+        timer.start()
+
+    def step(self, vfo, delta_hz):
+        # Paso relativo desde lo último pedido mientras no se haya escrito
+        # (esperando el debounce o en la cola del planificador); si no, desde
+        # lo que reporta el radio (el operador pudo mover el dial)
+        with self._lock:
+            base = self._target.get(vfo) if vfo in self._pending else None
+        if base is None:
+            base = getattr(self.poller.snapshot(), f"vfo_{vfo.lower()}")
+        if base is None:
+            return None
+        freq = max(0, base + delta_hz)
+        self.tune(vfo, freq)
+        return freq
+
+    def _flush(self, vfo):
+        with self._lock:
+            self._timers.pop(vfo, None)
+        # La llave fusiona este trabajo con uno que siga en cola; la frecuencia
+        # se lee al ejecutarse, no al encolarse
+        return self.scheduler.submit(lambda cat: self._write_target(cat, vfo), PRIORITY_WRITE,
+                                     key=('tune', vfo))
+
+    def _write_target(self, cat, vfo):
+        with self._lock:
+            freq = self._target.get(vfo)
+            tune = self._pending.get(vfo)
+        try:
+            if freq is None or freq == getattr(self.poller.snapshot(), f"vfo_{vfo.lower()}"):
+                self.skipped += 1
+                return None
+            cat.set(f"F{vfo}{freq:011d};")
+            self.sent += 1
+            return freq
+        finally:
+            # Ya escrito (o falló): los siguientes pasos parten del radio,
+            # salvo que haya llegado otro tune() mientras tanto
+            with self._lock:
+                if self._pending.get(vfo) == tune:
+                    self._pending.pop(vfo, None)
@@ -0,0 +1,107 @@
+from collections import deque
+
+from .rig import parse_frame
+
+# ----------- PARSER INCREMENTAL DE TRAMAS CAT -----------
+# Cada lectura del puerto se agrega a un bytearray que vive lo que vive el
+# transporte y solo guarda la trama a medias (lo que viene después del
+# último ';'). Lo completo se decodifica de una vez y se parte por ';': un str
+# por lectura más uno por trama, sin copiar ni recortar el buffer trama por
+# trama. La trama a medias se completa con la siguiente lectura.
+#
+# next_frame() entrega las tramas en el orden en que llegaron, a:
+#   - los listeners, con la trama cruda (sin ';'), pedida o no;
+#   - los handlers registrados para su prefijo de dos letras, con el valor ya
+#     decodificado por parse_frame (Hz, IFStatus, modo, nivel...). Las tramas
+#     truncadas o con basura no llegan a los handlers; se cuentan en `malformed`.
+
+TERMINATOR = b';'
+
+# Longitud exacta (sin ';') de las respuestas de longitud fija
+FRAME_LENGTHS = {'FA': 13, 'FB': 13, 'FR': 3, 'FT': 3, 'MD': 3, 'SM': 7}
+
+
+def decode(frame):
+    # Valor tipado de la trama o None si está incompleta o no se entiende
+    expected = FRAME_LENGTHS.get(frame[:2])
+    if expected is not None and len(frame) != expected:
+        return None
+    try:
+        return parse_frame(frame)
+    except ValueError:
+        return None
+
+
+class FrameParser:
+    def __init__(self):
+        self._buf = bytearray()     # trama incompleta
+        self._frames = deque()      # tramas completas aún no entregadas
+        self.listeners = []         # fn(trama)
+        self.handlers = {}          # prefijo -> [fn(valor, trama)]
+        self.frames = 0
+        self.malformed = 0
+
+    def __len__(self):
+        # Tramas completas que todavía no se entregan
+        return len(self._frames)
+
+    def feed(self, chunk):
+        self._buf += chunk
+        end = self._buf.rfind(TERMINATOR)
+        if end < 0:
+            return
+        text = self._buf[:end].decode('ascii', 'replace')
+        del self._buf[:end + 1]
+        self._frames.extend(text.split(';'))
+
+    def clear(self):
+        self._buf.clear()
+        self._frames.clear()
+
+    # --- registro ---
+    def add_listener(self, fn):
+        if fn not in self.listeners:
+            self.listeners.append(fn)
+
+    def remove_listener(self, fn):
+        if fn in self.listeners:
+            self.listeners.remove(fn)
+
+    def add_handler(self, prefix, fn):
+        fns = self.handlers.setdefault(prefix, [])
+        if fn not in fns:
+            fns.append(fn)
+
+    def remove_handler(self, prefix, fn):
+        fns = self.handlers.get(prefix, [])
+        if fn in fns:
+            fns.remove(fn)
+
+    # --- extracción ---
+    def next_frame(self):
+        # Siguiente trama completa (sin ';'), ya entregada, o None si no hay
+        if not self._frames:
+            return None
+        frame = self._frames.popleft().strip()
+        self.frames += 1
+        self._dispatch(frame)
+        return frame
+
+    def _dispatch(self, frame):
+        for fn in self.listeners[:]:
+            try:
+                fn(frame)
+            except Exception:
+                pass
+        fns = self.handlers.get(frame[:2])
+        if not fns:
+            return
+        value = decode(frame)
+        if value is None:
+            self.malformed += 1
+            return
+        for fn in fns[:]:
+            try:
+                fn(value, frame)
+            except Exception:
+                pass
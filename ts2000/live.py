@@ -0,0 +1,172 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .rig import format_freq, smeter_units
+
+# ----------- CANAL EN VIVO PARA EL DISPLAY (SERVER-SENT EVENTS) -----------
+# En lugar de reejecutar toda la página cada segundo, el Display se dibuja una
+# vez y un pequeño componente HTML abre un EventSource contra este servidor.
+# Cada cliente espera a que cambie el estado del poller y recibe solo los
+# campos que cambiaron (frecuencias, modos, S-meter), hasta MAX_RATE veces
+# por segundo.
+
+LIVE_PORT = 8765
+MAX_RATE = 20           # actualizaciones por segundo por cliente, como máximo
+HEARTBEAT = 15.0        # s; comentario SSE para que los proxies no corten la conexión
+
+
+def live_fields(rig):
+    # Lo que dibuja el componente, ya formateado
+    s_label, s_units = smeter_units(rig.smeter) if rig.smeter is not None else ("--", 0)
+    return {
+        'vfo_a': format_freq(rig.vfo_a),
+        'vfo_b': format_freq(rig.vfo_b),
+        'mode_a': rig.mode_a,
+        'mode_b': rig.mode_b,
+        'smeter': f"{rig.smeter:04d}" if rig.smeter is not None else "----",
+        's_label': s_label,
+        's_units': s_units,
+        'flags': " · ".join(rig.flags()),
+        'tx': rig.tx,
+    }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _headers(self, content_type):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Access-Control-Allow-Origin", "*")
+
+    def do_GET(self):
+        poller = self.server.poller
+        if self.path == "/state":
+            body = json.dumps(live_fields(poller.snapshot())).encode()
+            self._headers("application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        if self.path != "/events":
+            self.send_error(404)
+            return
+
+        self._headers("text/event-stream")
+        self.send_header("Connection", "keep-alive")
+        self.end_headers()
+        sent = {}
+        version = -1
+        min_interval = 1.0 / MAX_RATE
+        try:
+            while not self.server.stopping:
+                start = time.monotonic()
+                version, rig = poller.wait_for_change(version, HEARTBEAT)
+                fields = live_fields(rig)
+                diff = {k: v for k, v in fields.items() if sent.get(k) != v}
+                if diff:
+                    sent.update(diff)
+                    self.wfile.write(f"data: {json.dumps(diff)}\n\n".encode())
+                else:
+                    self.wfile.write(b": ping\n\n")
+                self.wfile.flush()
+                # Agrupa los cambios que lleguen muy seguidos
+                elapsed = time.monotonic() - start
+                if elapsed < min_interval:
+                    time.sleep(min_interval - elapsed)
+        except (BrokenPipeError, ConnectionResetError, OSError):
+            pass
+
+
+class LiveServer:
+    def __init__(self, poller, host="0.0.0.0", port=LIVE_PORT):
+        self.poller = poller
+        self.host = host
+        self.port = port
+        self._httpd = None
+        self._thread = None
+
+    def start(self):
+        # Lanza OSError si el puerto está ocupado
+        self._httpd = ThreadingHTTPServer((self.host, self.port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.poller = self.poller
+        self._httpd.stopping = False
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="live-display", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._httpd:
+            self._httpd.stopping = True
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+
+LIVE_HTML = """
+<div style="font-family:sans-serif; color:#ccc;">
+  <div style="height:10px"></div>
+  <div style="display:flex; align-items:center; gap:16px;">
+    <div style="width:16%;">
+      <div style="font-size:20px; color:#0af;">🔵 MAIN</div>
+      <div style="font-size:28px; color:#888;">VFO A</div>
+    </div>
+    <div>
+      <div style="font-size:64px; color:#f80; font-family:monospace;">
+        <span id="vfo_a">--.----- MHz</span>
+        <span style="font-size:24px; color:#0af;">[<span id="mode_a">---</span>]</span>
+      </div>
+      <div id="flags" style="font-size:16px; color:#888;"></div>
+    </div>
+  </div>
+  <div style="display:flex; align-items:center; gap:16px;">
+    <div style="width:16%; font-size:28px; color:#888;">VFO B</div>
+    <div style="font-size:28px; color:#f80; font-family:monospace;">
+      <span id="vfo_b">--.----- MHz</span>
+      <span style="font-size:18px; color:#0af;">[<span id="mode_b">---</span>]</span>
+    </div>
+  </div>
+  <div style="display:flex; align-items:center; gap:16px; margin-top:12px;">
+    <div id="bar" style="background:#222; border-radius:8px; height:22px; width:240px; display:inline-block;"></div>
+    <span id="s_label" style="font-size:18px; color:#ccc; padding-left:12px;">--</span>
+  </div>
+  <div style="font-size:14px; color:#888; margin-top:2px;">Valor SM: <span id="smeter">----</span></div>
+  <div id="status" style="font-size:12px; color:#666; margin-top:6px;"></div>
+</div>
+<script>
+  const COLORS = ["#ff0","#ff0","#ff0","#ff0","#7f7","#7f7","#7f7","#7f7","#fa0","#fa0","#f00","#f00"];
+  const bar = document.getElementById("bar");
+  const cells = [];
+  for (let i = 0; i < 12; i++) {
+    const c = document.createElement("div");
+    c.style.cssText = "background:#444; width:18px; height:18px; display:inline-block; margin:2px 0 0 2px; border-radius:4px;";
+    bar.appendChild(c);
+    cells.push(c);
+  }
+  function apply(d) {
+    for (const k of ["vfo_a", "vfo_b", "mode_a", "mode_b", "smeter", "s_label", "flags"]) {
+      if (k in d) document.getElementById(k).textContent = d[k];
+    }
+    if ("s_units" in d) cells.forEach((c, i) => c.style.background = i < d.s_units ? COLORS[i] : "#444");
+    if ("tx" in d) document.getElementById("flags").style.color = d.tx ? "#f00" : "#888";
+  }
+  let host = "localhost";
+  try { host = window.parent.location.hostname || host; } catch (e) {}
+  const status = document.getElementById("status");
+  const es = new EventSource(`http://${host}:__PORT__/events`);
+  es.onmessage = (e) => { apply(JSON.parse(e.data)); status.textContent = ""; };
+  es.onerror = () => { status.textContent = "Reconectando con el radio…"; };
+</script>
+"""
+
+
+def live_html(port):
+    return LIVE_HTML.replace("__PORT__", str(port))
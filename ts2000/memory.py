@@ -0,0 +1,195 @@
+import hashlib
+import json
+import os
+import time
+
+from .cat import CatError, CatTimeout
+from .rig import MODES
+from .scheduler import PRIORITY_QUERY
+
+# ----------- RESPALDO Y RESTAURACIÓN DE CANALES DE MEMORIA -----------
+# Los 300 canales se leen con MR en lotes: cada lote es un solo trabajo del
+# planificador que manda CHUNK comandos en una escritura y espera todas las
+# respuestas, así una escritura del operador solo espera un lote, no el banco
+# completo. El resultado se guarda en disco con un hash por canal; al
+# restaurar solo se manda MW de los canales cuyo hash es distinto.
+#
+# Datos de MR/MW después de P1 y el canal (3 dígitos):
+#   frecuencia(11) modo(1) lockout(1) tipo de tono(1) tono(2) CTCSS(2)
+#   DCS(3) reverse(1) shift(1) offset(9) paso(1) grupo(1) nombre(hasta 8)
+
+MEMORY_CHANNELS = 300
+SIDES = (0, 1)              # P1: 0 = frecuencia de RX, 1 = frecuencia de TX (split)
+CHUNK = 20                  # canales por lote
+CHUNK_TIMEOUT = 0.5         # s por respuesta dentro del lote
+CACHE_FILE = "memorias_ts2000.json"
+CACHE_VERSION = 1
+
+
+def channel_key(side, channel):
+    return f"{side}{channel:03d}"
+
+
+def memory_hash(data):
+    return hashlib.sha1((data or "").encode()).hexdigest()[:16]
+
+
+def decode_memory(data):
+    # Campos legibles de un canal; None si el canal está vacío
+    if not data or len(data) < 11 or not data[:11].isdigit() or int(data[:11]) == 0:
+        return None
+    return {
+        'freq': int(data[:11]),
+        'mode': MODES.get(data[11:12], "---"),
+        'name': data[35:].strip(),
+    }
+
+
+class MemoryBank:
+    def __init__(self, channels=None, read_at=None, port=None):
+        self.channels = dict(channels or {})    # "PCCC" -> datos de MR (str) o None si vacío
+        self.read_at = read_at
+        self.port = port
+        self.hashes = {k: memory_hash(v) for k, v in self.channels.items()}
+
+    def __len__(self):
+        return len(self.channels)
+
+    def set(self, key, data):
+        self.channels[key] = data
+        self.hashes[key] = memory_hash(data)
+
+    def diff(self, other):
+        # Llaves de `other` cuyo contenido no coincide con este banco
+        return sorted(k for k, h in other.hashes.items() if self.hashes.get(k) != h)
+
+    def rows(self):
+        rows = []
+        for key in sorted(self.channels):
+            info = decode_memory(self.channels[key])
+            if info is None:
+                continue
+            rows.append({
+                'Canal': int(key[1:]),
+                'Lado': "TX" if key[0] == '1' else "RX",
+                'MHz': f"{info['freq'] / 1_000_000:.5f}",
+                'Modo': info['mode'],
+                'Nombre': info['name'],
+            })
+        return rows
+
+    # --- disco ---
+    def to_json(self):
+        return json.dumps({
+            'version': CACHE_VERSION,
+            'port': self.port,
+            'read_at': self.read_at,
+            'channels': {k: {'data': v, 'hash': self.hashes[k]} for k, v in sorted(self.channels.items())},
+        }, indent=1)
+
+    @classmethod
+    def from_json(cls, text):
+        raw = json.loads(text)
+        if raw.get('version') != CACHE_VERSION:
+            raise ValueError("Versión de archivo de memorias no soportada")
+        channels = {k: v.get('data') for k, v in raw.get('channels', {}).items()}
+        return cls(channels, raw.get('read_at'), raw.get('port'))
+
+    def save(self, path=CACHE_FILE):
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.to_json())
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path=CACHE_FILE):
+        # None si no hay caché o no se puede leer
+        try:
+            with open(path, encoding="utf-8") as f:
+                return cls.from_json(f.read())
+        except (OSError, ValueError):
+            return None
+
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def dump_memories(scheduler, channels=range(MEMORY_CHANNELS), sides=SIDES, progress=None):
+    # Lee los canales pedidos; regresa (banco, errores). Los lotes se encolan
+    # todos de una vez para que el puerto no quede ocioso entre lote y lote.
+    keys = [channel_key(side, ch) for ch in channels for side in sides]
+    jobs = [
+        (chunk, scheduler.submit(
+            lambda cat, cmds=[f"MR{k};" for k in chunk]: cat.batch(cmds, CHUNK_TIMEOUT),
+            PRIORITY_QUERY))
+        for chunk in _chunks(keys, CHUNK)
+    ]
+    bank = MemoryBank(read_at=time.time())
+    errors = []
+    done = 0
+    for chunk, job in jobs:
+        try:
+            replies = job.result(timeout=CHUNK_TIMEOUT * len(chunk) + 5)
+        except Exception as e:
+            errors.extend(f"MR{k}: {e}" for k in chunk)
+            replies = {}
+        for key in chunk:
+            frame = replies.get(f"MR{key}")
+            if isinstance(frame, CatTimeout):
+                errors.append(f"MR{key}: sin respuesta")
+            elif isinstance(frame, CatError):
+                bank.set(key, None)     # '?;': canal vacío o inexistente
+            elif frame is not None:
+                bank.set(key, frame[6:])
+        done += len(chunk)
+        if progress:
+            progress(done, len(keys))
+    return bank, errors
+
+
+def _write_chunk(cat, chunk, cmds):
+    # Todos los MW en una escritura más un ID: cuando vuelve el ID el radio ya
+    # procesó los anteriores. Si algún MW contestó '?', se repiten uno por uno
+    # para saber cuál fue.
+    replies = cat.batch(['ID;'], CHUNK_TIMEOUT * len(cmds), setup=cmds)
+    if not isinstance(replies['ID'], Exception):
+        return {k: None for k in chunk}
+    results = {}
+    for key, cmd in zip(chunk, cmds):
+        try:
+            cat.set(cmd)
+            results[key] = None
+        except CatError as e:
+            results[key] = str(e)
+    return results
+
+
+def restore_memories(scheduler, target, current, progress=None):
+    # Escribe en el radio los canales de `target` que difieren de `current`
+    # (la última lectura o la caché). Regresa (escritos, errores) y deja
+    # `current` actualizado con lo que sí se escribió.
+    keys = [k for k in current.diff(target) if target.channels.get(k)]
+    jobs = []
+    for chunk in _chunks(keys, CHUNK):
+        cmds = [f"MW{k}{target.channels[k]};" for k in chunk]
+        jobs.append((chunk, scheduler.submit(
+            lambda cat, chunk=chunk, cmds=cmds: _write_chunk(cat, chunk, cmds), PRIORITY_QUERY)))
+    written, errors = [], []
+    done = 0
+    for chunk, job in jobs:
+        try:
+            results = job.result(timeout=CHUNK_TIMEOUT * len(chunk) * 2 + 5)
+        except Exception as e:
+            results = {k: str(e) for k in chunk}
+        for key, error in results.items():
+            if error is None:
+                current.set(key, target.channels[key])
+                written.append(key)
+            else:
+                errors.append(f"MW{key}: {error}")
+        done += len(chunk)
+        if progress:
+            progress(done, len(keys))
+    return written, errors
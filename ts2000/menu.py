@@ -0,0 +1,209 @@
+import json
+import os
+import time
+from dataclasses import dataclass
+
+from .baud import BAUD_MENU
+from .cat import CatError, CatTimeout
+from .scheduler import PRIORITY_QUERY
+
+# ----------- FOTO, COMPARACIÓN Y RESTAURACIÓN DEL MENÚ EX -----------
+# EX P1(3) P2(2) P3 P4 [P5]: P1 = número de menú, P2 = submenú (01 = "A",
+# 02 = "B", ...), P3 y P4 fijos en 0, P5 = valor. Sin P5 es una lectura.
+#
+# Todo el menú se lee en lotes (un trabajo del planificador por lote) y queda
+# en una foto con un valor por elemento que se puede guardar en archivo. Al
+# restaurar un perfil se lee primero el estado real del radio y solo se
+# escriben los elementos distintos; luego se releen para confirmar.
+# Los elementos que el radio contesta con '?;' no existen en ese firmware y
+# simplemente no aparecen en la foto.
+#
+# El menú 56 (velocidad del puerto COM) queda fuera de fotos y perfiles: si
+# se escribiera, el radio cambiaría de velocidad y el puerto no, y se perdería
+# la comunicación a media restauración. Se cambia desde Configuración
+# (negotiate_baud), que mueve radio y puerto juntos.
+
+MENU_NUMBERS = range(0, 63)
+MENU_SUBMENUS = {61: (1, 2)}    # menús con submenús (61A, 61B); el resto solo tiene 00
+CHUNK = 16
+CHUNK_TIMEOUT = 0.5
+PROFILE_VERSION = 1
+
+
+def menu_key(number, sub=0):
+    return f"{number:03d}{sub:02d}00"
+
+
+def menu_keys():
+    keys = (menu_key(n, s) for n in MENU_NUMBERS for s in MENU_SUBMENUS.get(n, (0,)))
+    return [k for k in keys if k != BAUD_MENU]
+
+
+@dataclass(frozen=True)
+class MenuItem:
+    key: str        # P1 P2 P3 P4 (7 dígitos)
+    value: str      # P5 tal como lo manda el radio
+
+    @property
+    def number(self):
+        return int(self.key[:3])
+
+    @property
+    def sub(self):
+        return int(self.key[3:5])
+
+    @property
+    def label(self):
+        # "61A", "07"...
+        return f"{self.number:02d}" + (chr(ord('A') + self.sub - 1) if self.sub else "")
+
+    @property
+    def number_value(self):
+        # Valor numérico si P5 son solo dígitos, si no None
+        return int(self.value) if self.value.isdigit() else None
+
+
+class MenuSnapshot:
+    def __init__(self, items=None, read_at=None, name=""):
+        self.items = {}             # llave -> MenuItem
+        for item in items or ():
+            self.items[item.key] = item
+        self.read_at = read_at
+        self.name = name
+
+    def __len__(self):
+        return len(self.items)
+
+    def values(self):
+        return {k: item.value for k, item in self.items.items()}
+
+    def diff(self, target):
+        # Elementos de `target` cuyo valor es distinto en esta foto
+        return [item for k, item in sorted(target.items.items())
+                if k not in self.items or self.items[k].value != item.value]
+
+    def rows(self, other=None):
+        rows = []
+        for key, item in sorted(self.items.items()):
+            row = {'Menú': item.label, 'Valor': item.value}
+            if other is not None:
+                theirs = other.items.get(key)
+                row['Perfil'] = theirs.value if theirs else ""
+                row['Cambia'] = theirs is not None and theirs.value != item.value
+            rows.append(row)
+        return rows
+
+    # --- disco ---
+    def to_json(self):
+        return json.dumps({
+            'version': PROFILE_VERSION,
+            'name': self.name,
+            'read_at': self.read_at,
+            'items': self.values(),
+        }, indent=1, sort_keys=True)
+
+    @classmethod
+    def from_json(cls, text):
+        raw = json.loads(text)
+        if raw.get('version') != PROFILE_VERSION:
+            raise ValueError("Versión de perfil no soportada")
+        items = [MenuItem(k, str(v)) for k, v in raw.get('items', {}).items()
+                 if len(k) == 7 and k.isdigit()]
+        return cls(items, raw.get('read_at'), raw.get('name', ""))
+
+    def save(self, path):
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.to_json())
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path):
+        try:
+            with open(path, encoding="utf-8") as f:
+                return cls.from_json(f.read())
+        except (OSError, ValueError):
+            return None
+
+
+def read_menu(scheduler, keys=None, progress=None):
+    # Regresa (foto, errores). Todos los lotes se encolan de una vez.
+    keys = list(keys or menu_keys())
+    chunks = [keys[i:i + CHUNK] for i in range(0, len(keys), CHUNK)]
+    jobs = [
+        (chunk, scheduler.submit(
+            lambda cat, cmds=[f"EX{k};" for k in chunk]: cat.batch(cmds, CHUNK_TIMEOUT),
+            PRIORITY_QUERY))
+        for chunk in chunks
+    ]
+    items, errors = [], []
+    done = 0
+    for chunk, job in jobs:
+        try:
+            replies = job.result(timeout=CHUNK_TIMEOUT * len(chunk) + 5)
+        except Exception as e:
+            errors.extend(f"EX{k}: {e}" for k in chunk)
+            replies = {}
+        for key in chunk:
+            frame = replies.get(f"EX{key}")
+            if isinstance(frame, CatTimeout):
+                errors.append(f"EX{key}: sin respuesta")
+            elif frame is not None and not isinstance(frame, CatError):
+                items.append(MenuItem(key, frame[9:]))
+        done += len(chunk)
+        if progress:
+            progress(done, len(keys))
+    return MenuSnapshot(items, time.time()), errors
+
+
+def _write_items(cat, items):
+    # Todos los EX en una escritura más un ID de confirmación; si hubo '?',
+    # se repiten uno por uno para saber cuál fue
+    cmds = [f"EX{item.key}{item.value};" for item in items]
+    replies = cat.batch(['ID;'], CHUNK_TIMEOUT * len(cmds), setup=cmds)
+    if not isinstance(replies['ID'], Exception):
+        return {item.key: None for item in items}
+    results = {}
+    for item, cmd in zip(items, cmds):
+        try:
+            cat.set(cmd)
+            results[item.key] = None
+        except CatError as e:
+            results[item.key] = str(e)
+    return results
+
+
+def restore_menu(scheduler, target, progress=None):
+    # Compara contra el radio, escribe solo lo distinto y lo relee.
+    # Regresa (escritos, errores, foto final del radio).
+    # Un perfil guardado antes de excluir el menú 56 todavía puede traerlo
+    target = MenuSnapshot([item for key, item in target.items.items() if key != BAUD_MENU])
+    live, errors = read_menu(scheduler, target.items.keys())
+    pending = live.diff(target)
+    chunks = [pending[i:i + CHUNK] for i in range(0, len(pending), CHUNK)]
+    jobs = [(chunk, scheduler.submit(lambda cat, chunk=chunk: _write_items(cat, chunk), PRIORITY_QUERY))
+            for chunk in chunks]
+    written = []
+    done = 0
+    for chunk, job in jobs:
+        try:
+            results = job.result(timeout=CHUNK_TIMEOUT * len(chunk) * 2 + 5)
+        except Exception as e:
+            results = {item.key: str(e) for item in chunk}
+        for key, error in results.items():
+            if error is None:
+                written.append(key)
+            else:
+                errors.append(f"EX{key}: {error}")
+        done += len(chunk)
+        if progress:
+            progress(done, len(pending))
+    if written:
+        check, check_errors = read_menu(scheduler, written)
+        errors.extend(check_errors)
+        for item in check.diff(MenuSnapshot([target.items[k] for k in written])):
+            errors.append(f"EX{item.key}: el radio no aceptó {item.value}")
+            written.remove(item.key)
+        for key, item in check.items.items():
+            live.items[key] = item
+    return written, errors, live
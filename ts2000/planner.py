@@ -0,0 +1,192 @@
+import threading
+import time
+from dataclasses import dataclass
+
+# ----------- PLANIFICADOR DE SONDEO POR CAMPO -----------
+# Cada consulta del poller (IF, FA, FB, OI, SM0) tiene su propio intervalo,
+# entre un mínimo y un máximo. Si la última lectura trajo un valor distinto,
+# el intervalo vuelve al mínimo; si no, crece BACKOFF veces hasta el máximo.
+# Así el S-meter, que se mueve todo el tiempo, se sigue leyendo rápido, y la
+# frecuencia del VFO B, que casi nunca cambia, baja a una lectura cada pocos
+# segundos.
+#
+# - mark_activity(): el operador está usando Control (o llegó una escritura
+#   por rigctld); durante ACTIVITY_WINDOW s todos los campos van a su mínimo.
+# - Con Auto-Information activo el radio empuja IF/FA/FB en cuanto cambian;
+#   esos campos ("pushed") solo se consultan a su máximo, para resincronizar.
+# - request(): alguien necesita un campo más seguido (el historial del
+#   S-meter pide SM0 a 20 Hz); el intervalo queda en el menor de los dos
+#   mientras no se llame release().
+# - El total nunca pasa de `max_rate` comandos por segundo: si hay más campos
+#   vencidos que presupuesto, salen primero los más atrasados y los demás
+#   esperan al siguiente turno.
+# - back_off(): el operador lanzó un barrido de banda; mientras dure, todos
+#   los campos van a su máximo para dejarle el puerto al barrido, que no
+#   tiene tope propio. end_back_off() los regresa a su ritmo.
+
+BACKOFF = 1.5
+ACTIVITY_WINDOW = 5.0       # s de sondeo rápido tras usar Control
+MAX_RATE = 25.0             # comandos por segundo de todas las lecturas de fondo
+
+
+@dataclass(frozen=True)
+class PollField:
+    key: str                # comando sin ';' (clave de read_batch)
+    min_interval: float
+    max_interval: float
+    pushed: bool = False    # AI lo reporta solo
+
+
+POLL_FIELDS = (
+    PollField('IF', 0.5, 10.0, pushed=True),
+    PollField('FA', 0.5, 10.0, pushed=True),
+    PollField('FB', 1.0, 10.0, pushed=True),
+    PollField('OI', 1.0, 10.0),         # VFO inactivo: AI no reporta su modo
+    PollField('SM0', 0.25, 2.0),
+)
+
+
+class _FieldState:
+    __slots__ = ('field', 'interval', 'due', 'value', 'polls', 'changes')
+
+    def __init__(self, field):
+        self.field = field
+        self.interval = field.min_interval
+        self.due = 0.0          # la primera vuelta lee todo
+        self.value = None
+        self.polls = 0
+        self.changes = 0
+
+
+class PollPlanner:
+    def __init__(self, fields=POLL_FIELDS, max_rate=MAX_RATE, activity_window=ACTIVITY_WINDOW):
+        self.max_rate = max_rate
+        self.activity_window = activity_window
+        self.auto_info = False
+        self._fields = {f.key: _FieldState(f) for f in fields}
+        self._tokens = max_rate
+        self._refilled = time.monotonic()
+        self._active_until = 0.0
+        self._requested = {}        # clave -> intervalo pedido con request()
+        self._backed_off = 0        # barridos en curso (back_off sin end_back_off)
+        self._lock = threading.Lock()
+
+    def remove(self, key):
+        # Campo que el radio no acepta (p. ej. OI en algunos firmwares)
+        with self._lock:
+            self._fields.pop(key, None)
+
+    def mark_activity(self):
+        with self._lock:
+            self._active_until = time.monotonic() + self.activity_window
+            # Lo que esté lejos se adelanta a su mínimo desde ahora
+            now = time.monotonic()
+            for state in self._fields.values():
+                state.due = min(state.due, now + self._interval(state, now))
+
+    def request(self, key, interval):
+        with self._lock:
+            self._requested[key] = interval
+            state = self._fields.get(key)
+            if state is not None:
+                state.due = min(state.due, time.monotonic() + interval)
+
+    def release(self, key):
+        with self._lock:
+            self._requested.pop(key, None)
+
+    def set_max_rate(self, rate):
+        # Al bajar el tope no se conserva el saldo acumulado con el anterior
+        with self._lock:
+            self._refill(time.monotonic())
+            self.max_rate = rate
+            self._tokens = min(self._tokens, rate)
+
+    def back_off(self):
+        with self._lock:
+            self._backed_off += 1
+
+    def end_back_off(self):
+        with self._lock:
+            self._backed_off = max(0, self._backed_off - 1)
+            now = time.monotonic()
+            for state in self._fields.values():
+                state.due = min(state.due, now + self._interval(state, now))
+
+    def active(self, now=None):
+        return (time.monotonic() if now is None else now) < self._active_until
+
+    def _interval(self, state, now):
+        field = state.field
+        if self._backed_off:
+            return field.max_interval
+        if self.auto_info and field.pushed:
+            interval = field.max_interval
+        elif now < self._active_until:
+            interval = field.min_interval
+        else:
+            interval = state.interval
+        return min(interval, self._requested.get(field.key, interval))
+
+    def _refill(self, now):
+        self._tokens = min(self.max_rate, self._tokens + (now - self._refilled) * self.max_rate)
+        self._refilled = now
+
+    def due(self, now=None):
+        # Claves a consultar ahora, dentro del presupuesto de comandos
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._refill(now)
+            late = sorted((s for s in self._fields.values() if s.due <= now), key=lambda s: s.due)
+            take = late[:int(self._tokens)]
+            self._tokens -= len(take)
+            return [s.field.key for s in take]
+
+    def observe(self, key, value, now=None):
+        # Resultado de una consulta: None si falló (se reintenta al mínimo)
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            state = self._fields.get(key)
+            if state is None:
+                return
+            state.polls += 1
+            field = state.field
+            if value is None:
+                state.interval = field.min_interval
+            elif value != state.value:
+                if state.value is not None:
+                    state.changes += 1
+                state.value = value
+                state.interval = field.min_interval
+            else:
+                state.interval = min(field.max_interval, state.interval * BACKOFF)
+            # Se cuenta desde cuando tocaba, no desde que llegó la respuesta,
+            # para que el viaje de ida y vuelta no estire el intervalo; si se
+            # atrasó más de un intervalo (presupuesto), desde ahora
+            interval = self._interval(state, now)
+            base = state.due if now - state.due < interval else now
+            state.due = base + interval
+
+    def next_wait(self, now=None):
+        # Segundos hasta que haya algo que consultar (y presupuesto para ello)
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if not self._fields:
+                return self.activity_window
+            wait = max(0.0, min(s.due for s in self._fields.values()) - now)
+            self._refill(now)
+            if self._tokens < 1:
+                wait = max(wait, (1 - self._tokens) / self.max_rate)
+            return wait
+
+    def rows(self, now=None):
+        # Estado de cada campo para mostrarlo en Diagnóstico
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            return [{
+                'Campo': s.field.key,
+                'Intervalo (s)': round(self._interval(s, now), 2),
+                'Próxima en (s)': round(max(0.0, s.due - now), 2),
+                'Lecturas': s.polls,
+                'Cambios': s.changes,
+            } for s in self._fields.values()]
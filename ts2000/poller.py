@@ -0,0 +1,265 @@
+import threading
+import time
+from dataclasses import dataclass, replace
+
+from .cat import CatError
+from .planner import PollPlanner
+from .rig import IF_VFOS, MODES, read_batch
+from .scheduler import PRIORITY_POLL, PRIORITY_WRITE
+
+# ----------- POLLER ÚNICO POR RADIO -----------
+# Un solo hilo consulta el radio y publica una "foto" del estado. Las páginas
+# de Streamlit solo leen esa foto, así el tráfico serie no depende de cuántos
+# navegadores estén abiertos. El puerto en sí lo maneja el CommandScheduler:
+# el poller le manda sus ráfagas con la prioridad más baja.
+#
+# Qué se consulta y cada cuánto lo decide el PollPlanner (planner.py): cada
+# campo a su ritmo, más rápido mientras cambia o mientras se usa Control, y
+# con un tope de comandos por segundo. Con Auto-Information (AI2) el radio
+# empuja FA/FB/IF/MD en cuanto cambian; esos campos solo se consultan de vez
+# en cuando por si se perdió alguna trama.
+#
+# El modo de VFO B se sigue sin conmutar FR1/FR0 (que hace "clic" en el radio
+# y le cambia el VFO al operador): con OI (estado del VFO inactivo, mismo
+# formato que IF) cuando el radio lo acepta, con las tramas IF/MD que llegan
+# mientras B está activo y con la sombra de nuestros propios comandos MD.
+
+
+@dataclass(frozen=True)
+class RigState:
+    vfo_a: int = None       # Hz
+    vfo_b: int = None       # Hz
+    mode_a: str = "---"
+    mode_b: str = "---"
+    smeter: int = None
+    active_vfo: str = "A"   # 'A', 'B' o 'MEM' según P9 de IF
+    tx: bool = False
+    split: bool = False
+    rit_on: bool = False
+    xit_on: bool = False
+    rit_offset: int = 0     # Hz
+    updated: float = 0.0    # time.time() del último ciclo con respuesta
+
+    def age(self):
+        if not self.updated:
+            return None
+        return time.time() - self.updated
+
+    def flags(self):
+        # Estado extra que llega en la respuesta IF, como textos cortos
+        flags = [f"RX: VFO {self.active_vfo}" if self.active_vfo != "MEM" else "RX: MEMORIA"]
+        if self.tx:
+            flags.append("TX")
+        if self.split:
+            flags.append("SPLIT")
+        if self.rit_on:
+            flags.append(f"RIT {self.rit_offset:+d} Hz")
+        if self.xit_on:
+            flags.append(f"XIT {self.rit_offset:+d} Hz")
+        return flags
+
+
+class RigPoller:
+    def __init__(self, scheduler, planner=None, auto_info=True):
+        self.scheduler = scheduler
+        self.cat = scheduler.cat
+        self.planner = planner or PollPlanner()
+        self.auto_info = auto_info
+        self.ai_active = False
+        self._rx_vfo = 'A'      # VFO de recepción según las últimas tramas FR/IF
+        self.last_errors = {}   # errores de la última ráfaga de consultas
+        self.oi_supported = None  # None mientras no sepamos si el radio acepta OI
+        self._state = RigState()
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self.version = 0        # sube cada vez que cambia algún campo del estado
+        self._stop = threading.Event()
+        self._wake = threading.Event()  # adelanta el siguiente turno (actividad)
+        self._thread = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        for prefix, fn in self._frame_handlers().items():
+            self.cat.add_handler(prefix, fn)
+        self.cat.add_write_listener(self.apply_write)
+        self._thread = threading.Thread(target=self._run, name="rig-poller", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+        for prefix, fn in self._frame_handlers().items():
+            self.cat.remove_handler(prefix, fn)
+        self.cat.remove_write_listener(self.apply_write)
+        if self.ai_active:
+            try:
+                self.scheduler.set('AI0;').result(timeout=1)
+            except Exception:
+                pass
+            self.ai_active = False
+
+    def snapshot(self):
+        with self._lock:
+            return self._state
+
+    def update(self, **fields):
+        # Solo sobrescribe los campos que llegaron; conserva el último valor válido
+        fields = {k: v for k, v in fields.items() if v is not None and v != "---"}
+        if not fields:
+            return
+        with self._lock:
+            changed = any(getattr(self._state, k) != v for k, v in fields.items())
+            self._state = replace(self._state, updated=time.time(), **fields)
+            if changed:
+                self.version += 1
+                self._changed.notify_all()
+
+    def wait_for_change(self, version, timeout=None):
+        # Bloquea hasta que el estado cambie respecto a `version` (o timeout).
+        # Regresa (versión, foto) para que el llamador siga esperando desde ahí.
+        with self._changed:
+            self._changed.wait_for(lambda: self.version != version, timeout)
+            return self.version, self._state
+
+    # --- tramas recibidas (pedidas o de AI), ya decodificadas por el parser ---
+    def _frame_handlers(self):
+        return {
+            'FA': self._on_vfo_a,
+            'FB': self._on_vfo_b,
+            'FR': self._on_rx_vfo,
+            'MD': self._on_mode,
+            'IF': self._on_if,
+            'OI': self._on_oi,
+            'SM': self._on_smeter,
+        }
+
+    def _on_vfo_a(self, hz, frame):
+        self.update(vfo_a=hz)
+
+    def _on_vfo_b(self, hz, frame):
+        self.update(vfo_b=hz)
+
+    def _on_rx_vfo(self, value, frame):
+        self._rx_vfo = 'B' if frame[2] == '1' else 'A'
+
+    def _on_mode(self, mode, frame):
+        self.update(**{f"mode_{self._rx_vfo.lower()}": mode})
+
+    def _on_if(self, status, frame):
+        self.apply_if(status)
+
+    def _on_oi(self, status, frame):
+        self.apply_other_vfo(status)
+
+    def _on_smeter(self, level, frame):
+        if frame[2] == '0':     # SM1 es el receptor secundario
+            self.update(smeter=level)
+
+    def apply_if(self, status):
+        if status is None:
+            return
+        fields = dict(
+            active_vfo=status.vfo, tx=status.tx, split=status.split,
+            rit_on=status.rit_on, xit_on=status.xit_on, rit_offset=status.rit_offset,
+        )
+        if status.vfo in ('A', 'B'):
+            self._rx_vfo = status.vfo
+            vfo = status.vfo.lower()
+            fields[f"vfo_{vfo}"] = status.freq
+            fields[f"mode_{vfo}"] = status.mode
+        self.update(**fields)
+
+    def apply_other_vfo(self, status):
+        # OI describe el VFO que no está activo; no toca TX/split/RIT
+        if status is None or status.vfo not in ('A', 'B'):
+            return
+        vfo = status.vfo.lower()
+        self.update(**{f"vfo_{vfo}": status.freq, f"mode_{vfo}": status.mode})
+
+    def apply_write(self, cmd):
+        # Sombra de nuestros propios comandos: el radio no contesta a FR/MD de
+        # escritura (salvo con AI), pero sabemos qué acabamos de pedirle
+        try:
+            if cmd.startswith('FR') and len(cmd) == 3:
+                self._rx_vfo = 'B' if cmd[2] == '1' else 'A'
+                self.update(active_vfo=IF_VFOS.get(cmd[2]))
+            elif cmd in ('TX', 'TX0', 'RX'):
+                self.update(tx=cmd != 'RX')
+            elif cmd.startswith('MD') and len(cmd) == 3:
+                self.update(**{f"mode_{self._rx_vfo.lower()}": MODES.get(cmd[2])})
+            elif cmd[:2] in ('FA', 'FB') and len(cmd) == 13:
+                self.update(**{f"vfo_{cmd[1].lower()}": int(cmd[2:])})
+        except ValueError:
+            pass
+
+    def _batch(self, cmds):
+        job = self.scheduler.submit(lambda cat: read_batch(cat, cmds), PRIORITY_POLL,
+                                    key=('poll', tuple(cmds)))
+        values, errors = job.result()
+        if 'OI' in values and values['OI'] is not None:
+            self.oi_supported = True
+            self.apply_other_vfo(values['OI'])
+        elif 'OI' in errors and not self.oi_supported:
+            # El radio no acepta OI: se deja de pedir
+            self.oi_supported = False
+            self.planner.remove('OI')
+            errors.pop('OI')
+        self.last_errors = errors
+        return values
+
+    def enable_auto_info(self):
+        try:
+            self.scheduler.set('AI2;', PRIORITY_WRITE).result()
+            self.ai_active = True
+        except CatError:
+            self.ai_active = False
+        return self.ai_active
+
+    def request(self, key, interval):
+        # Otro componente necesita `key` cada `interval` s (p. ej. el S-meter)
+        self.planner.request(key, interval)
+        self._wake.set()
+
+    def release(self, key):
+        self.planner.release(key)
+
+    def mark_activity(self):
+        # El operador está usando Control: sondeo rápido por unos segundos
+        self.planner.mark_activity()
+        self._wake.set()
+
+    def back_off(self):
+        # Un barrido de banda usa el puerto: solo resincronizar, a ritmo mínimo
+        self.planner.back_off()
+
+    def end_back_off(self):
+        self.planner.end_back_off()
+        self._wake.set()
+
+    def apply_values(self, values):
+        # IF trae frecuencia, modo, VFO, RIT/XIT, TX y split del VFO activo
+        self.apply_if(values.get('IF'))
+        self.update(vfo_a=values.get('FA'), vfo_b=values.get('FB'), smeter=values.get('SM0'))
+
+    def _run(self):
+        if self.auto_info:
+            self.enable_auto_info()
+        self.planner.auto_info = self.ai_active
+        while not self._stop.is_set():
+            keys = self.planner.due()
+            if keys:
+                try:
+                    values = self._batch([k + ';' for k in keys])
+                    self.apply_values(values)
+                except Exception:
+                    values = {}
+                now = time.monotonic()
+                for key in keys:
+                    self.planner.observe(key, values.get(key), now)
+            # Entre turnos el planificador sigue escuchando las tramas AI
+            self._wake.wait(self.planner.next_wait())
+            self._wake.clear()
@@ -0,0 +1,117 @@
+import json
+import os
+import sys
+import threading
+import time
+
+import serial.tools.list_ports
+
+# ----------- INVENTARIO DE PUERTOS SERIE EN CACHÉ -----------
+# comports() recorre sysfs (Linux) o el registro (Windows) y puede tardar
+# decenas de ms; las páginas lo pedían en cada reejecución. El inventario
+# guarda la lista y solo la vuelve a leer cuando cambia una firma barata:
+# en Linux el mtime de /dev y /dev/serial/by-id (un stat por directorio; se
+# modifican al conectar o quitar un adaptador). Donde no hay firma se relee
+# como máximo cada FALLBACK_TTL segundos.
+#
+# Un puerto se recuerda por una llave estable (número de serie USB o
+# VID:PID) y no por /dev/ttyUSBn, que cambia al reconectar.
+
+WATCHED_DIRS = ('/dev', '/dev/serial/by-id')
+FALLBACK_TTL = 5.0
+PORT_FILE = "puerto_ts2000.json"
+
+
+def port_key(info):
+    # Llave estable de un ListPortInfo
+    if info.vid is not None:
+        base = f"usb:{info.vid:04X}:{info.pid:04X}"
+        return f"{base}:{info.serial_number}" if info.serial_number else base
+    return info.device
+
+
+def port_label(info):
+    label = info.device
+    if info.description and info.description != "n/a":
+        label += f" — {info.description}"
+    if info.serial_number:
+        label += f" (S/N {info.serial_number})"
+    return label
+
+
+class PortInventory:
+    def __init__(self, watched=WATCHED_DIRS, ttl=FALLBACK_TTL):
+        self.watched = watched if sys.platform.startswith('linux') else ()
+        self.ttl = ttl
+        self.scans = 0              # veces que se llamó a comports()
+        self._ports = []
+        self._signature = None
+        self._scanned_at = 0.0
+        self._lock = threading.Lock()
+
+    def _current_signature(self):
+        sig = []
+        for path in self.watched:
+            try:
+                sig.append(os.stat(path).st_mtime_ns)
+            except OSError:
+                sig.append(None)
+        return tuple(sig)
+
+    def _stale(self):
+        if self._signature is None:
+            return True
+        if self.watched:
+            return self._current_signature() != self._signature
+        return time.monotonic() - self._scanned_at >= self.ttl
+
+    def ports(self, force=False):
+        with self._lock:
+            if force or self._stale():
+                # La firma se toma antes de escanear: un cambio durante el
+                # escaneo provoca otro en la siguiente consulta
+                self._signature = self._current_signature() if self.watched else ()
+                self._ports = sorted(serial.tools.list_ports.comports(), key=lambda p: p.device)
+                self._scanned_at = time.monotonic()
+                self.scans += 1
+            return list(self._ports)
+
+    def devices(self):
+        return [p.device for p in self.ports()]
+
+    def find(self, key):
+        # Dispositivo actual de una llave estable (o de un nombre de dispositivo)
+        ports = self.ports()
+        for p in ports:
+            if port_key(p) == key:
+                return p.device
+        # Mismo VID:PID aunque cambie el número de serie (o no tenga)
+        if key.startswith("usb:"):
+            vid_pid = ":".join(key.split(":")[:3])
+            for p in ports:
+                if port_key(p).startswith(vid_pid):
+                    return p.device
+        if key in (p.device for p in ports) or (not key.startswith("usb:") and os.path.exists(key)):
+            return key
+        return None
+
+    def key_for(self, device):
+        for p in self.ports():
+            if p.device == device:
+                return port_key(p)
+        return device
+
+
+def remember_port(key, path=PORT_FILE):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({'key': key}, f)
+    os.replace(tmp, path)
+
+
+def remembered_port(path=PORT_FILE):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f).get('key')
+    except (OSError, ValueError):
+        return None
@@ -0,0 +1,162 @@
+from dataclasses import dataclass
+
+# ----------- CONSULTAS DE ALTO NIVEL AL TS-2000 -----------
+
+MODES = {
+    '1': 'LSB', '2': 'USB', '3': 'CW', '4': 'FM',
+    '5': 'AM', '6': 'FSK', '7': 'CW-R', '8': 'FSK-R'
+}
+MODES_REV = {v: k for k, v in MODES.items()}
+
+
+def format_freq(hz):
+    if hz is None:
+        return "--.----- MHz"
+    return f"{hz / 1_000_000:.5f} MHz"
+
+
+def smeter_units(val):
+    # Valor SM0 (0-30) -> (etiqueta, segmentos encendidos de 12)
+    if val >= 30:
+        return "S9+60dB", 12
+    if val >= 24:
+        return "S9+40dB", 11
+    if val >= 20:
+        return "S9+20dB", 10
+    if val >= 17:
+        return "S9+10dB", 9
+    if val >= 15:
+        return "S9", 8
+    if val >= 12:
+        return "S7", 7
+    if val >= 9:
+        return "S5", 6
+    if val >= 6:
+        return "S3", 5
+    if val >= 3:
+        return "S1", 4
+    return "S0", 0
+
+
+def read_freq(cat, cmd):
+    # cmd: 'FA;' o 'FB;'. Regresa la frecuencia en Hz o None
+    try:
+        part = cat.query(cmd)
+        return int(part[2:])
+    except Exception:
+        return None
+
+
+# ----------- DECODIFICADOR DE LA RESPUESTA IF -----------
+# IF P1(11) P2(5) P3(5) P4 P5 P6(3) P7 P8 P9 P10 P11 P12 P13(2) P14 ;
+#    2..12  13..17 18..22 23 24 25..27 28 29 30 31 32 33 34..35 36
+IF_LENGTH = 37  # sin el ';'
+IF_VFOS = {'0': 'A', '1': 'B', '2': 'MEM'}
+IF_VFOS_REV = {v: k for k, v in IF_VFOS.items()}
+IF_TONES = {'0': 'OFF', '1': 'TONE', '2': 'CTCSS', '3': 'DCS'}
+IF_SHIFTS = {'0': 'SIMPLEX', '1': '+', '2': '-', '3': '-7.6'}
+
+
+@dataclass(frozen=True)
+class IFStatus:
+    freq: int               # Hz del VFO/memoria activo
+    step: str               # P2, el TS-2000 lo deja en blanco
+    rit_offset: int         # Hz, con signo (compartido por RIT y XIT)
+    rit_on: bool
+    xit_on: bool
+    memory_channel: int
+    tx: bool
+    mode: str
+    vfo: str                # 'A', 'B' o 'MEM'
+    scan: bool
+    split: bool
+    tone: str
+    tone_number: int
+    shift: str
+
+
+def decode_if(response):
+    # Regresa IFStatus o None si la trama no es una respuesta IF completa.
+    # OI (estado del VFO que no está activo) usa el mismo formato que IF.
+    if response[:2] not in ("IF", "OI") or len(response) < IF_LENGTH:
+        return None
+    r = response
+    try:
+        return IFStatus(
+            freq=int(r[2:13]),
+            step=r[13:18].strip(),
+            rit_offset=int(r[18:23]),
+            rit_on=r[23] == '1',
+            xit_on=r[24] == '1',
+            memory_channel=int(r[25:28]),
+            tx=r[28] == '1',
+            mode=MODES.get(r[29], "---"),
+            vfo=IF_VFOS.get(r[30], "---"),
+            scan=r[31] == '1',
+            split=r[32] == '1',
+            tone=IF_TONES.get(r[33], "---"),
+            tone_number=int(r[34:36]),
+            shift=IF_SHIFTS.get(r[36], "---"),
+        )
+    except ValueError:
+        return None
+
+
+def parse_frame(frame):
+    # Convierte una respuesta en su valor: Hz, IFStatus, modo, nivel SM...
+    prefix = frame[:2]
+    if prefix in ('FA', 'FB'):
+        return int(frame[2:])
+    if prefix in ('IF', 'OI'):
+        return decode_if(frame)
+    if prefix == 'MD':
+        return MODES.get(frame[2:], "---")
+    if prefix == 'SM':
+        return int(frame[3:7])
+    return frame
+
+
+def read_batch(cat, cmds, timeout=None):
+    # Una sola ráfaga serie para varias consultas.
+    # Regresa (valores, errores), ambos indexados por el comando sin ';'
+    values, errors = {}, {}
+    for key, frame in cat.batch(cmds, timeout).items():
+        if isinstance(frame, Exception):
+            errors[key] = str(frame)
+            continue
+        try:
+            values[key] = parse_frame(frame)
+        except ValueError:
+            errors[key] = f"Respuesta inválida: {frame};"
+    return values, errors
+
+
+def read_if(cat):
+    try:
+        return decode_if(cat.query('IF;'))
+    except Exception:
+        return None
+
+
+def read_smeter(cat):
+    try:
+        response = cat.query('SM0;')
+        if response.startswith('SM0'):
+            return int(response[3:7])
+    except Exception:
+        pass
+    return None
+
+
+def write_mode(cat, vfo, mode_code, rx_vfo='A'):
+    # El modo solo se puede cambiar en el VFO de recepción: si `vfo` ya lo es
+    # basta MD; si no, FR al otro VFO, MD, y de regreso a `rx_vfo`
+    if vfo == rx_vfo:
+        cat.set(f'MD{mode_code};')
+        return
+    with cat.lock:
+        cat.set(f"FR{IF_VFOS_REV[vfo]};")
+        try:
+            cat.set(f'MD{mode_code};')
+        finally:
+            cat.set(f"FR{IF_VFOS_REV.get(rx_vfo, '0')};")
@@ -0,0 +1,254 @@
+import argparse
+import socketserver
+import threading
+import time
+
+from .broadcast import BROADCAST_PORT, FORMATS, StateBroadcaster
+from .connection import ConnectionManager
+from .control import RigControl
+from .planner import MAX_RATE, PollPlanner
+from .poller import RigPoller
+from .scheduler import PRIORITY_PTT, CommandScheduler
+
+# ----------- SERVIDOR COMPATIBLE CON RIGCTLD (HAMLIB) -----------
+# Loggers, programas de modos digitales y rotores hablan el protocolo de red
+# de rigctld (modelo 2, "NET rigctl"). Las lecturas (f, m, t, v, l) salen de
+# la foto del poller, sin tocar el puerto, así que no importa cuántos
+# clientes pregunten ni qué tan seguido. Las escrituras (F, M, T, V) pasan
+# por RigControl / el planificador compartido, con la misma prioridad que las
+# del operador en la web.
+#
+#     python -m ts2000.rigctld --port /dev/ttyUSB0 --baud 9600
+#
+# y en el programa cliente: Hamlib "NET rigctl", localhost:4532.
+
+RIGCTLD_PORT = 4532
+WRITE_TIMEOUT = 2.0
+
+# Modo TS-2000 <-> modo Hamlib, con el ancho de banda que se reporta
+HAMLIB_MODES = {
+    'LSB': 'LSB', 'USB': 'USB', 'CW': 'CW', 'CW-R': 'CWR',
+    'FM': 'FM', 'AM': 'AM', 'FSK': 'RTTY', 'FSK-R': 'RTTYR',
+}
+HAMLIB_MODES_REV = {v: k for k, v in HAMLIB_MODES.items()}
+PASSBAND = {'LSB': 2400, 'USB': 2400, 'CW': 500, 'CWR': 500, 'FM': 15000, 'AM': 6000, 'RTTY': 500, 'RTTYR': 500}
+
+RIG_OK = 0
+RIG_EINVAL = -1     # argumento inválido
+RIG_ENIMPL = -4     # comando no implementado
+RIG_EIO = -6        # el radio no aceptó el comando / no contestó
+
+# Respuesta a \dump_state en el formato del protocolo 0 (lo que piden los
+# clientes al conectarse): rangos amplios y ninguna función extra
+DUMP_STATE = "\n".join([
+    "0", "2", "2",
+    "30000.000000 60000000.000000 0x1ff -1 -1 0x3 0x0",
+    "142000000.000000 146000000.000000 0x1ff -1 -1 0x3 0x0",
+    "430000000.000000 440000000.000000 0x1ff -1 -1 0x3 0x0",
+    "1240000000.000000 1300000000.000000 0x1ff -1 -1 0x3 0x0",
+    "0 0 0 0 0 0 0",
+    "1800000.000000 60000000.000000 0x1ff 5000 100000 0x3 0x0",
+    "0 0 0 0 0 0 0",
+    "0x1ff 1", "0x1ff 0", "0 0",
+    "0x1ff 2400", "0 0",
+    "9990", "9990", "0", "0",
+    "", "",
+    "0x0", "0x0", "0x0", "0x0", "0x0", "0x0",
+]) + "\n"
+
+LONG_NAMES = {
+    'get_freq': 'f', 'set_freq': 'F', 'get_mode': 'm', 'set_mode': 'M',
+    'get_ptt': 't', 'set_ptt': 'T', 'get_vfo': 'v', 'set_vfo': 'V',
+    'get_level': 'l', 'dump_state': 'dump_state', 'chk_vfo': 'chk_vfo',
+    'get_powerstat': 'get_powerstat', 'quit': 'q',
+}
+
+
+def strength_db(smeter):
+    # SM0 (0-30; S9 = 15) -> dB respecto a S9 como lo reporta Hamlib
+    if smeter is None:
+        return 0
+    if smeter <= 15:
+        return round((smeter / 15 * 9 - 9) * 6)
+    return round((smeter - 15) / 15 * 60)
+
+
+class RigctlSession:
+    # Interpreta una línea de comando y regresa la respuesta (texto con '\n')
+    def __init__(self, poller, control):
+        self.poller = poller
+        self.control = control
+        self.scheduler = control.scheduler
+
+    def _rx_vfo(self, state):
+        return state.active_vfo if state.active_vfo in ('A', 'B') else 'A'
+
+    def _wait(self, futures):
+        # CatError, CatTimeout o el Future que no terminó a tiempo
+        try:
+            for f in futures:
+                f.result(timeout=WRITE_TIMEOUT)
+        except Exception:
+            return RIG_EIO
+        return RIG_OK
+
+    def handle(self, line):
+        parts = line.strip().split()
+        if not parts:
+            return ""
+        cmd, args = parts[0], parts[1:]
+        if cmd.startswith('\\'):
+            cmd = LONG_NAMES.get(cmd[1:], cmd)
+        state = self.poller.snapshot()
+        vfo = self._rx_vfo(state)
+
+        if cmd == 'f':
+            freq = getattr(state, f"vfo_{vfo.lower()}")
+            return f"{freq or 0}\n"
+        if cmd == 'm':
+            mode = HAMLIB_MODES.get(getattr(state, f"mode_{vfo.lower()}"), 'USB')
+            return f"{mode}\n{PASSBAND[mode]}\n"
+        if cmd == 't':
+            return f"{int(state.tx)}\n"
+        if cmd == 'v':
+            return f"VFO{vfo}\n"
+        if cmd == 'l':
+            if args[:1] != ['STRENGTH']:
+                return f"RPRT {RIG_ENIMPL}\n"
+            return f"{strength_db(state.smeter)}\n"
+        if cmd == 'dump_state':
+            return DUMP_STATE
+        if cmd == 'chk_vfo':
+            return "0\n"
+        if cmd == 'get_powerstat':
+            return "1\n"
+
+        if cmd == 'F':
+            try:
+                freq = int(float(args[0]))
+            except (IndexError, ValueError):
+                return f"RPRT {RIG_EINVAL}\n"
+            return f"RPRT {self._wait(self.control.apply(vfo, freq=freq))}\n"
+        if cmd == 'M':
+            mode = HAMLIB_MODES_REV.get(args[0] if args else '')
+            if mode is None:
+                return f"RPRT {RIG_EINVAL}\n"
+            return f"RPRT {self._wait(self.control.apply(vfo, mode=mode))}\n"
+        if cmd == 'T':
+            if not args or args[0] not in ('0', '1', '2', '3'):
+                return f"RPRT {RIG_EINVAL}\n"
+            ptt = 'RX;' if args[0] == '0' else 'TX;'
+            return f"RPRT {self._wait([self.scheduler.set(ptt, PRIORITY_PTT)])}\n"
+        if cmd == 'V':
+            target = {'VFOA': 'A', 'VFOB': 'B', 'Main': 'A', 'Sub': 'B'}.get(args[0] if args else '')
+            if target is None:
+                return f"RPRT {RIG_EINVAL}\n"
+            if target == vfo:
+                return f"RPRT {RIG_OK}\n"
+            code = '1' if target == 'B' else '0'
+            return f"RPRT {self._wait([self.scheduler.set(f'FR{code};')])}\n"
+        return f"RPRT {RIG_ENIMPL}\n"
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        session = RigctlSession(self.server.poller, self.server.control)
+        self.server.clients += 1
+        try:
+            for raw in self.rfile:
+                line = raw.decode(errors='replace').strip()
+                if line in ('q', 'Q', '\\quit'):
+                    break
+                self.server.requests += 1
+                self.wfile.write(session.handle(line).encode())
+        except (ConnectionResetError, BrokenPipeError, OSError):
+            pass
+        finally:
+            self.server.clients -= 1
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class RigctlServer:
+    def __init__(self, poller, control, host="127.0.0.1", port=RIGCTLD_PORT):
+        self.poller = poller
+        self.control = control
+        self.host = host
+        self.port = port
+        self._server = None
+        self._thread = None
+
+    def running(self):
+        return self._server is not None
+
+    def clients(self):
+        return self._server.clients if self._server else 0
+
+    def requests(self):
+        return self._server.requests if self._server else 0
+
+    def start(self):
+        # Lanza OSError si el puerto está ocupado
+        if self._server:
+            return self
+        self._server = _Server((self.host, self.port), _Handler)
+        self._server.poller = self.poller
+        self._server.control = self.control
+        self._server.clients = 0
+        self._server.requests = 0
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="rigctld", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor rigctld (Hamlib) para el TS-2000")
+    parser.add_argument("--port", required=True, help="puerto serie del radio")
+    parser.add_argument("--baud", type=int, default=9600)
+    parser.add_argument("--listen", default="127.0.0.1", help="dirección donde escuchar")
+    parser.add_argument("--tcp-port", type=int, default=RIGCTLD_PORT)
+    parser.add_argument("--udp", default=None, metavar="HOST[:PUERTO]",
+                        help=f"además difundir los cambios por UDP (puerto {BROADCAST_PORT} por omisión)")
+    parser.add_argument("--udp-format", choices=list(FORMATS), default='json')
+    parser.add_argument("--poll-rate", type=float, default=MAX_RATE,
+                        help="tope de comandos por segundo del sondeo")
+    args = parser.parse_args()
+
+    connections = ConnectionManager()
+    scheduler = CommandScheduler(connections.connect(args.port, args.baud))
+    scheduler.start()
+    poller = RigPoller(scheduler, PollPlanner(max_rate=args.poll_rate))
+    poller.start()
+    server = RigctlServer(poller, RigControl(scheduler, poller), args.listen, args.tcp_port).start()
+    print(f"rigctld en {args.listen}:{server.port} para el TS-2000 en {args.port}. Ctrl+C para salir.")
+    broadcaster = None
+    if args.udp:
+        host, _, udp_port = args.udp.partition(':')
+        broadcaster = StateBroadcaster(poller, host, int(udp_port or BROADCAST_PORT), args.udp_format).start()
+        print(f"Difundiendo cambios a {host}:{broadcaster.address[1]} ({args.udp_format})")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if broadcaster:
+            broadcaster.stop()
+        server.stop()
+        poller.stop()
+        scheduler.stop()
+        connections.close()
+
+
+if __name__ == "__main__":
+    main()
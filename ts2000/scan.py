@@ -0,0 +1,169 @@
+import threading
+import time
+
+import numpy as np
+
+from .cat import CatError
+from .scheduler import PRIORITY_POLL
+
+# ----------- BARRIDO DE BANDA (SINTONIZAR Y MEDIR EN RÁFAGA) -----------
+# Cada paso manda 'FAxxxxxxxxxxx;SM0;' en una sola escritura y luego solo
+# vuelve a leer SM0 hasta que la lectura se estabiliza (salida temprana) o se
+# agota el dwell. Nada de sleeps fijos: la velocidad la pone el radio. Cada
+# lectura es un trabajo aparte del planificador, así las escrituras del
+# operador no esperan a que termine un paso completo. Mientras mide, el poller
+# se hace a un lado (RigPoller.back_off) y el barrido no tiene tope de
+# comandos/s; en pausa el poller vuelve a su ritmo.
+#
+# Los resultados quedan en arreglos NumPy: freqs (pasos) y levels
+# (barridos x pasos, NaN = sin medir) para el espectro y la cascada.
+
+DWELL = 0.3         # s máximos por paso
+MIN_DWELL = 0.03    # s mínimos antes de aceptar una lectura estable
+SETTLE_READS = 2    # lecturas iguales seguidas que cuentan como "estable"
+MAX_STEPS = 100_000
+
+
+class BandScan:
+    def __init__(self, scheduler, poller=None):
+        self.scheduler = scheduler
+        self.poller = poller        # se le pide que espacie el sondeo mientras se mide
+        self.freqs = np.zeros(0, dtype=np.int64)
+        self.levels = np.zeros((0, 0), dtype=np.float32)
+        self.state = 'idle'         # idle, running, paused, done, stopped, error
+        self.message = ""
+        self.sweep = 0
+        self.index = 0
+        self.hits = []              # (frecuencia, nivel) que superaron el umbral
+        self.started = None
+        self.finished = None
+        self._resume = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # --- control ---
+    def start(self, start_hz, stop_hz, step_hz, dwell=DWELL, min_dwell=MIN_DWELL,
+              threshold=None, hold=None, sweeps=1, vfo='A'):
+        if self.running():
+            raise RuntimeError("Ya hay un barrido en curso")
+        if step_hz <= 0 or stop_hz < start_hz:
+            raise ValueError("Rango o paso inválido")
+        freqs = np.arange(start_hz, stop_hz + 1, step_hz, dtype=np.int64)
+        if len(freqs) > MAX_STEPS:
+            raise ValueError(f"Demasiados pasos ({len(freqs)}); el máximo es {MAX_STEPS}")
+        self.freqs = freqs
+        self.levels = np.full((sweeps, len(freqs)), np.nan, dtype=np.float32)
+        self.params = dict(dwell=dwell, min_dwell=min_dwell, threshold=threshold, hold=hold, vfo=vfo)
+        self.sweep = self.index = 0
+        self.hits = []
+        self.message = ""
+        self.started, self.finished = time.time(), None
+        self._stop.clear()
+        self._resume.clear()
+        self.state = 'running'
+        self._thread = threading.Thread(target=self._run, name="band-scan", daemon=True)
+        self._thread.start()
+
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def pause(self):
+        if self.state == 'running':
+            self._resume.clear()
+            self.state = 'paused'
+
+    def resume(self):
+        if self.state == 'paused':
+            self.state = 'running'
+            self._resume.set()
+
+    def stop(self):
+        self._stop.set()
+        self._resume.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def progress(self):
+        total = self.levels.size
+        return 0.0 if not total else (self.sweep * len(self.freqs) + self.index) / total
+
+    def steps_per_second(self):
+        if not self.started:
+            return 0.0
+        done = self.sweep * len(self.freqs) + self.index
+        return done / max(1e-6, (self.finished or time.time()) - self.started)
+
+    # --- medición ---
+    def _read(self, setup=()):
+        job = self.scheduler.submit(lambda cat: cat.batch(['SM0;'], setup=setup), PRIORITY_POLL)
+        frame = job.result(timeout=5)['SM0']
+        if isinstance(frame, Exception):
+            raise frame
+        return int(frame[3:7])
+
+    def _measure(self, freq):
+        p = self.params
+        tuned = time.monotonic()
+        readings = [self._read(setup=[f"F{p['vfo']}{freq:011d};"])]
+        while True:
+            elapsed = time.monotonic() - tuned
+            stable = len(readings) >= SETTLE_READS and len(set(readings[-SETTLE_READS:])) == 1
+            if elapsed >= p['dwell'] or (stable and elapsed >= p['min_dwell']):
+                return readings[-1]
+            readings.append(self._read())
+
+    def _wait_if_paused(self, hold=None):
+        # Pausa manual: hasta resume() o stop(). Tras un pico: a lo más `hold` s
+        if self.state != 'paused':
+            return
+        if self.poller is not None:
+            self.poller.end_back_off()
+        self._resume.wait(hold)
+        if self.poller is not None:
+            self.poller.back_off()
+        if self.state == 'paused':
+            self.state = 'running'
+
+    def _run(self):
+        vfo = self.params['vfo']
+        original = None
+        try:
+            original = self.scheduler.query(f"F{vfo};").result(timeout=5)
+        except Exception:
+            pass
+        if self.poller is not None:
+            self.poller.back_off()
+        try:
+            for self.sweep in range(self.levels.shape[0]):
+                for self.index, freq in enumerate(self.freqs):
+                    self._wait_if_paused()
+                    if self._stop.is_set():
+                        self.state = 'stopped'
+                        return
+                    try:
+                        level = self._measure(int(freq))
+                    except CatError:
+                        continue    # '?;' o sin respuesta: queda NaN
+                    self.levels[self.sweep, self.index] = level
+                    threshold = self.params['threshold']
+                    if threshold is not None and level >= threshold:
+                        self.hits.append((int(freq), level))
+                        self.state = 'paused'
+                        self._resume.clear()
+                        self._wait_if_paused(self.params['hold'])
+                self.index = len(self.freqs)
+            self.sweep = self.levels.shape[0]
+            self.index = 0
+            self.state = 'done'
+        except Exception as e:
+            self.state = 'error'
+            self.message = str(e)
+        finally:
+            self.finished = time.time()
+            if self.poller is not None:
+                self.poller.end_back_off()
+            if original:
+                try:
+                    self.scheduler.set(original + ';').result(timeout=5)
+                except Exception:
+                    pass
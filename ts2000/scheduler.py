@@ -0,0 +1,119 @@
+import heapq
+import itertools
+import threading
+from concurrent.futures import Future
+
+from .cat import READ_SLICE
+
+# ----------- PLANIFICADOR DE COMANDOS CAT -----------
+# Un solo hilo es dueño del puerto: todas las páginas y el poller le mandan
+# trabajos y reciben un Future con la respuesta. Los trabajos se ejecutan por
+# prioridad (PTT > escrituras del operador > consultas > sondeo de fondo) y
+# un sondeo idéntico que ya está en cola se comparte en lugar de repetirse.
+# Cuando no hay trabajo el hilo escucha tramas AI no solicitadas.
+#
+# Nota: no llamar .result() desde dentro de un trabajo; el único hilo que
+# ejecuta trabajos se quedaría esperándose a sí mismo.
+
+PRIORITY_PTT = 0
+PRIORITY_WRITE = 1
+PRIORITY_QUERY = 2
+PRIORITY_POLL = 3
+
+IDLE_SLICE = READ_SLICE  # escucha entre trabajos; acota la latencia de un comando nuevo
+
+
+class _Job:
+    __slots__ = ('fn', 'key', 'future')
+
+    def __init__(self, fn, key):
+        self.fn = fn
+        self.key = key
+        self.future = Future()
+
+
+class CommandScheduler:
+    def __init__(self, cat):
+        self.cat = cat
+        self._queue = []        # heap de (prioridad, secuencia, trabajo)
+        self._queued = {}       # llave -> trabajo en cola (para fusionar duplicados)
+        self._seq = itertools.count()
+        self._idle = False      # el hilo está escuchando el puerto sin trabajo
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="cat-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+        # Lo que quedó en cola ya no se va a ejecutar
+        with self._lock:
+            while self._queue:
+                _, _, job = heapq.heappop(self._queue)
+                job.future.cancel()
+            self._queued.clear()
+
+    def submit(self, fn, priority=PRIORITY_QUERY, key=None):
+        # fn(cat) se ejecuta en el hilo del planificador. Si `key` coincide con
+        # un trabajo que sigue en cola, se regresa el Future de ese trabajo.
+        with self._lock:
+            if key is not None and key in self._queued:
+                return self._queued[key].future
+            job = _Job(fn, key)
+            heapq.heappush(self._queue, (priority, next(self._seq), job))
+            if key is not None:
+                self._queued[key] = job
+            idle = self._idle
+        if idle:
+            # Despierta al hilo si está bloqueado en una lectura de escucha
+            cancel = getattr(self.cat.ser, 'cancel_read', None)
+            if cancel:
+                try:
+                    cancel()
+                except Exception:
+                    pass
+        return job.future
+
+    def query(self, cmd, priority=PRIORITY_QUERY, timeout=None):
+        return self.submit(lambda cat: cat.query(cmd, timeout), priority, key=('query', cmd))
+
+    def set(self, cmd, priority=PRIORITY_WRITE):
+        return self.submit(lambda cat: cat.set(cmd), priority)
+
+    def batch(self, cmds, priority=PRIORITY_POLL, timeout=None):
+        return self.submit(lambda cat: cat.batch(cmds, timeout), priority, key=('batch', tuple(cmds)))
+
+    def _next_job(self):
+        with self._lock:
+            if not self._queue:
+                self._idle = True
+                return None
+            self._idle = False
+            _, _, job = heapq.heappop(self._queue)
+            if job.key is not None:
+                self._queued.pop(job.key, None)
+            return job
+
+    def _run(self):
+        while not self._stop.is_set():
+            job = self._next_job()
+            if job is None:
+                try:
+                    self.cat.pump(IDLE_SLICE)
+                except Exception:
+                    self._stop.wait(IDLE_SLICE)
+                continue
+            if not job.future.set_running_or_notify_cancel():
+                continue
+            try:
+                job.future.set_result(job.fn(self.cat))
+            except Exception as e:
+                job.future.set_exception(e)
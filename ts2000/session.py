@@ -0,0 +1,191 @@
+import streamlit as st
+
+from .baud import detect_baud, load_link_settings, save_link_settings
+from .broadcast import StateBroadcaster
+from .connection import ConnectionManager
+from .control import RigControl
+from .live import LiveServer
+from .poller import RigPoller
+from .rigctld import RigctlServer
+from .ports import PortInventory, remembered_port
+from .scan import BandScan
+from .scheduler import CommandScheduler
+from .smeter import SMeterSampler
+from .telemetry import TelemetryRecorder
+
+# ----------- PIEZAS COMPARTIDAS POR LAS PÁGINAS DE STREAMLIT -----------
+
+LINK_DEFAULTS = {'baudrate': 9600, 'dtr': False, 'rts': False}
+
+
+def init_session_state():
+    # INICIALIZACIÓN SESSION_STATE (NUNCA ESTÁ VACÍO)
+    # SERIAL_PORT solo refleja el puerto de la app en cada ejecución
+    st.session_state['SERIAL_PORT'] = selected_port()
+    if not st.session_state['SERIAL_PORT']:
+        st.error("No se detectaron puertos seriales. Ve a Configuración y selecciona uno.")
+        st.stop()
+
+
+@st.cache_resource
+def get_port_inventory():
+    # Lista de puertos compartida; solo se vuelve a escanear si hubo hotplug
+    return PortInventory()
+
+
+def link_settings(port):
+    # Configuración del puerto que se eligió en Configuración (o la que se
+    # detectó al abrirlo); es la misma para todas las sesiones
+    return dict(LINK_DEFAULTS, **(load_link_settings(port) or {}))
+
+
+def _detect_on_open(port, cat):
+    # Primera vez con este puerto: buscar la velocidad del radio y recordarla
+    if load_link_settings(port) is None:
+        found = detect_baud(cat, first=cat.ser.baudrate)
+        if found:
+            save_link_settings(port, {'baudrate': found})
+
+
+@st.cache_resource
+def get_connections():
+    # Manejadores serie por (puerto, baudios, DTR, RTS), compartidos por todas las sesiones
+    return ConnectionManager(on_open=_detect_on_open)
+
+
+def selected_port():
+    # El puerto es de la app, no de cada navegador: el último que se abrió
+    # (solo Configuración lo cambia, con select_port) o, al arrancar, el
+    # recordado en disco o el primero que aparezca
+    current = get_connections().current
+    if current:
+        return current
+    inventory = get_port_inventory()
+    remembered = remembered_port()
+    device = inventory.find(remembered) if remembered else None
+    if device:
+        return device
+    puertos_disponibles = inventory.devices()
+    return puertos_disponibles[0] if puertos_disponibles else ""
+
+
+def _open(port):
+    settings = link_settings(port)
+    return get_connections().connect(port, settings['baudrate'], settings['dtr'], settings['rts'])
+
+
+def init_serial():
+    # Ya no está en caché por sí misma: el administrador abre el puerto de la
+    # app con la configuración guardada la primera vez y después lo deja como
+    # está; las páginas no le mandan valores de su sesión
+    port = selected_port()
+    st.session_state['SERIAL_PORT'] = port
+    try:
+        return _open(port)
+    except Exception as e:
+        st.error(f"No se pudo abrir el puerto {port}: {e}")
+        st.stop()
+        return None
+
+
+def select_port(port):
+    # Cambia el radio de toda la app. Un radio a la vez: los servicios del
+    # puerto anterior se apagan. Lanza la excepción de pyserial si no abre.
+    previous = get_connections().current
+    cat = _open(port)
+    if previous is not None and previous != port:
+        release_port(previous)
+    return cat
+
+
+# ----------- SERVICIOS POR PUERTO -----------
+# Todo lo que sigue está en caché por puerto y tiene hilos o sockets propios.
+# Al cambiar de puerto se detienen los del anterior y se sacan de la caché:
+# si no, el poller seguiría consultando un manejador estacionado y el
+# LiveServer viejo seguiría ocupando el puerto TCP 8765.
+
+@st.cache_resource
+def get_port_services():
+    # puerto -> [(función en caché, argumentos, objeto)] en orden de creación
+    return {}
+
+
+def _register(port, getter, args, obj):
+    get_port_services().setdefault(port, []).append((getter, args, obj))
+    return obj
+
+
+def release_port(port):
+    # Detiene los servicios de `port` (los últimos creados primero)
+    for getter, args, obj in reversed(get_port_services().pop(port, [])):
+        stop = getattr(obj, 'stop', None)
+        if stop is not None:
+            try:
+                stop()
+            except Exception:
+                pass
+        getter.clear(*args)
+
+
+@st.cache_resource
+def get_scheduler(port, _cat):
+    # Un solo hilo dueño del puerto por radio; todas las sesiones le encolan comandos
+    scheduler = CommandScheduler(_cat)
+    scheduler.start()
+    return _register(port, get_scheduler, (port, _cat), scheduler)
+
+
+@st.cache_resource
+def get_poller(port, _scheduler):
+    # Un poller por radio (puerto), compartido por todas las sesiones
+    poller = RigPoller(_scheduler)
+    poller.start()
+    return _register(port, get_poller, (port, _scheduler), poller)
+
+
+@st.cache_resource
+def get_live_server(port, _poller):
+    # Servidor SSE del display en vivo; None si no se pudo abrir (puerto ocupado)
+    try:
+        live = LiveServer(_poller).start()
+    except OSError:
+        live = None
+    return _register(port, get_live_server, (port, _poller), live)
+
+
+@st.cache_resource
+def get_smeter_sampler(port, _poller):
+    # Muestreo del S-meter a 20 Hz con historial en un buffer circular
+    sampler = SMeterSampler(_poller)
+    sampler.start()
+    return _register(port, get_smeter_sampler, (port, _poller), sampler)
+
+
+@st.cache_resource
+def get_band_scan(port, _scheduler, _poller):
+    # Un barrido por radio; sigue corriendo aunque el navegador se recargue
+    return _register(port, get_band_scan, (port, _scheduler, _poller), BandScan(_scheduler, _poller))
+
+
+@st.cache_resource
+def get_rig_control(port, _scheduler, _poller):
+    # Escrituras del operador con diferencias contra el estado y sintonía sin cola
+    return _register(port, get_rig_control, (port, _scheduler, _poller), RigControl(_scheduler, _poller))
+
+
+@st.cache_resource
+def get_rigctl_server(port, _poller, _control):
+    # Servidor rigctld para loggers; se arranca y detiene desde Configuración
+    return _register(port, get_rigctl_server, (port, _poller, _control), RigctlServer(_poller, _control))
+
+
+@st.cache_resource
+def get_state_broadcaster(port, _poller):
+    # Difusión UDP de los cambios; una por radio, se activa desde Configuración
+    return _register(port, get_state_broadcaster, (port, _poller), StateBroadcaster(_poller))
+
+
+@st.cache_resource
+def get_telemetry_recorder(port, _poller):
+    # Graba cada cambio del estado en Parquet mientras la app esté corriendo
+    return _register(port, get_telemetry_recorder, (port, _poller), TelemetryRecorder(_poller).start())
@@ -0,0 +1,289 @@
+import argparse
+import os
+import random
+import select
+import termios
+import threading
+import time
+import tty
+
+from .baud import BAUD_MENU, BAUD_RATES
+
+# ----------- TS-2000 SIMULADO EN UNA PSEUDO-TERMINAL (LINUX) -----------
+# Sirve el subconjunto CAT que usa este proyecto (FA, FB, FR, IF, OI, MD, SM,
+# RM, TX/RX, EX, AI, MR/MW, ID) en un pty, para probar y medir sin el radio conectado:
+#
+#     python -m ts2000.sim --baud 9600 --latency 0.01
+#
+# e indicar en Configuración (o en TS2000_PORT para los scripts de Test/) el
+# puerto /dev/pts/N que imprime. Permite simular la latencia de cada comando,
+# el ritmo real de la línea según los baudios, bytes perdidos y respuestas '?;'.
+
+DEFAULT_LATENCY = 0.005   # s que tarda el "radio" en procesar un comando
+BITS_PER_BYTE = 10        # 8N1: inicio + 8 datos + parada
+MEMORY_CHANNELS = 300
+EMPTY_MEMORY = '0' * 35   # P3..P14 de MR en ceros, sin nombre
+
+
+class SimulatedTS2000:
+    def __init__(self, baudrate=9600, latency=DEFAULT_LATENCY, latencies=None,
+                 drop_rate=0.0, error_rate=0.0, seed=None, strict_baud=False):
+        self.baudrate = baudrate
+        self.strict_baud = strict_baud          # ignorar comandos si el puerto no está a `baudrate`
+        self.latency = latency
+        self.latencies = dict(latencies or {})  # prefijo -> segundos
+        self.drop_rate = drop_rate              # probabilidad de perder cada byte enviado
+        self.error_rate = error_rate            # probabilidad de contestar '?;'
+        self.rng = random.Random(seed)
+        self.port = None
+        self.commands = 0                       # comandos atendidos
+        self.state = {
+            'FA': 14_200_000, 'FB': 7_100_000,
+            'MD_A': '2', 'MD_B': '1',
+            'FR': '0', 'FT': '0',
+            'TX': False, 'AI': '0',
+            'SM': 5,
+            'RIT': 0, 'RIT_ON': False, 'XIT_ON': False,
+            'EX': {BAUD_MENU: str(BAUD_RATES.index(baudrate)) if baudrate in BAUD_RATES else '1'},
+            # (P1, canal) -> datos de MR/MW después del número de canal
+            'MEM': {
+                (0, 0): '00146520000' + '4' + '0' * 23 + 'SIMPLEX',
+                (0, 1): '00145500000' + '4' + '0' * 23 + 'RPT',
+            },
+        }
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._master = None
+        self._slave = None
+        self._thread = None
+
+    # --- ciclo de vida ---
+    def start(self):
+        self._master, self._slave = os.openpty()
+        tty.setraw(self._slave)
+        self.port = os.ttyname(self._slave)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="ts2000-sim", daemon=True)
+        self._thread.start()
+        return self.port
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+        for fd in (self._master, self._slave):
+            if fd is not None:
+                os.close(fd)
+        self._master = self._slave = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # --- acciones del "operador" ---
+    def turn_knob(self, delta_hz):
+        # Como girar el dial: mueve el VFO activo y, con AI, empuja la trama
+        with self._lock:
+            key = 'FB' if self.state['FR'] == '1' else 'FA'
+            self.state[key] += delta_hz
+            frames = [f"{key}{self.state[key]:011d};", self._if_frame() + ';']
+        if self.state['AI'] != '0':
+            self._send(''.join(frames))
+
+    def set_smeter(self, value):
+        with self._lock:
+            self.state['SM'] = max(0, min(30, int(value)))
+
+    # --- protocolo ---
+    def _pace(self, nbytes):
+        if self.baudrate:
+            time.sleep(nbytes * BITS_PER_BYTE / self.baudrate)
+
+    def _send(self, reply):
+        if not reply or self._master is None:
+            return
+        data = reply.encode()
+        if self.drop_rate:
+            data = bytes(b for b in data if self.rng.random() >= self.drop_rate)
+        self._pace(len(data))
+        try:
+            os.write(self._master, data)
+        except OSError:
+            pass
+
+    def _rx_vfo(self):
+        return 'B' if self.state['FR'] == '1' else 'A'
+
+    def _if_frame(self, vfo=None):
+        vfo = vfo or self._rx_vfo()
+        s = self.state
+        return (
+            f"{'IF' if vfo == self._rx_vfo() else 'OI'}"
+            f"{s['F' + vfo]:011d}"
+            f"     "
+            f"{s['RIT']:+05d}"
+            f"{int(s['RIT_ON'])}{int(s['XIT_ON'])}"
+            f"000"
+            f"{int(s['TX'])}"
+            f"{s['MD_' + vfo]}"
+            f"{'1' if vfo == 'B' else '0'}"
+            f"0"
+            f"{int(s['FR'] != s['FT'])}"
+            f"0"
+            f"00"
+            f"0"
+        )
+
+    def handle(self, cmd):
+        # Regresa la respuesta (con ';') a un comando sin ';', o '' si no contesta
+        s = self.state
+        p, arg = cmd[:2], cmd[2:]
+        if p in ('FA', 'FB'):
+            if not arg:
+                return f"{p}{s[p]:011d};"
+            s[p] = int(arg)
+            return f"{p}{s[p]:011d};" if s['AI'] != '0' else ''
+        if p in ('FR', 'FT'):
+            if not arg:
+                return f"{p}{s[p]};"
+            if arg not in ('0', '1'):
+                return '?;'
+            s[p] = arg
+            if p == 'FR':
+                s['FT'] = arg
+            return ''
+        if p == 'MD':
+            key = 'MD_' + self._rx_vfo()
+            if not arg:
+                return f"MD{s[key]};"
+            if arg not in '12345678' or len(arg) != 1:
+                return '?;'
+            s[key] = arg
+            return f"MD{arg};" if s['AI'] != '0' else ''
+        if p == 'IF' and not arg:
+            return self._if_frame() + ';'
+        if p == 'OI' and not arg:
+            return self._if_frame('A' if self._rx_vfo() == 'B' else 'B') + ';'
+        if p == 'SM':
+            if arg not in ('0', '1'):
+                return '?;'
+            # Pequeña variación para que el S-meter "se mueva"
+            s['SM'] = max(0, min(30, s['SM'] + self.rng.choice((-1, 0, 0, 1))))
+            return f"SM{arg}{s['SM']:04d};"
+        if p == 'RM' and not arg:
+            return f"RM1{s['SM'] * 8:04d};"
+        if p in ('TX', 'RX'):
+            s['TX'] = p == 'TX'
+            return ''
+        if p == 'AI':
+            if not arg:
+                return f"AI{s['AI']};"
+            if arg not in '0123' or len(arg) != 1:
+                return '?;'
+            s['AI'] = arg
+            return ''
+        if p == 'EX':
+            if len(arg) < 7 or not arg.isdigit():
+                return '?;'
+            key, value = arg[:7], arg[7:]
+            if not value:
+                return f"EX{key}{s['EX'].get(key, '0')};"
+            s['EX'][key] = value
+            if key == BAUD_MENU and value.isdigit() and int(value) < len(BAUD_RATES):
+                self.baudrate = BAUD_RATES[int(value)]
+            return ''
+        if p in ('MR', 'MW'):
+            # MR P1 P2(3) ; / MW P1 P2(3) datos ;
+            if len(arg) < 4 or not arg[:4].isdigit() or arg[0] not in '01':
+                return '?;'
+            if int(arg[1:4]) >= MEMORY_CHANNELS:
+                return '?;'
+            key = (int(arg[0]), int(arg[1:4]))
+            if p == 'MR':
+                if len(arg) != 4:
+                    return '?;'
+                return f"MR{arg}{s['MEM'].get(key, EMPTY_MEMORY)};"
+            if len(arg) < 4 + len(EMPTY_MEMORY):
+                return '?;'
+            s['MEM'][key] = arg[4:]
+            return ''
+        if p == 'ID' and not arg:
+            return "ID019;"
+        return '?;'
+
+    def _delay_for(self, cmd):
+        return self.latencies.get(cmd[:2], self.latency)
+
+    def _line_matches(self):
+        # Con strict_baud, el "radio" solo entiende si el cliente configuró
+        # el pty a la misma velocidad; si no, lo que llega es basura
+        if not self.strict_baud:
+            return True
+        speed = getattr(termios, f"B{self.baudrate}", None)
+        try:
+            return termios.tcgetattr(self._slave)[5] == speed
+        except termios.error:
+            return True
+
+    def _process(self, cmd):
+        self.commands += 1
+        time.sleep(self._delay_for(cmd))
+        if self.error_rate and self.rng.random() < self.error_rate:
+            return '?;'
+        with self._lock:
+            return self.handle(cmd)
+
+    def _run(self):
+        buf = bytearray()
+        while not self._stop.is_set():
+            ready, _, _ = select.select([self._master], [], [], 0.05)
+            if not ready:
+                continue
+            try:
+                data = os.read(self._master, 1024)
+            except OSError:
+                break
+            self._pace(len(data))
+            if not self._line_matches():
+                buf.clear()
+                self._send('\x7f\x00')
+                continue
+            buf += data
+            while True:
+                idx = buf.find(b';')
+                if idx < 0:
+                    break
+                cmd = buf[:idx].decode(errors='replace').strip()
+                del buf[:idx + 1]
+                if cmd:
+                    self._send(self._process(cmd))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TS-2000 simulado en una pseudo-terminal")
+    parser.add_argument("--baud", type=int, default=9600)
+    parser.add_argument("--latency", type=float, default=DEFAULT_LATENCY)
+    parser.add_argument("--drop-rate", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--strict-baud", action="store_true",
+                        help="no contestar si el puerto no está a la velocidad del radio")
+    args = parser.parse_args()
+
+    sim = SimulatedTS2000(args.baud, args.latency, drop_rate=args.drop_rate,
+                          error_rate=args.error_rate, seed=args.seed, strict_baud=args.strict_baud)
+    print(f"TS-2000 simulado en {sim.start()} ({args.baud} baudios). Ctrl+C para salir.")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sim.stop()
+
+
+if __name__ == "__main__":
+    main()
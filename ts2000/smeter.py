@@ -0,0 +1,102 @@
+import threading
+import time
+
+import numpy as np
+
+# ----------- MUESTREO DEL S-METER A ALTA FRECUENCIA -----------
+# Las lecturas SM0 van a un buffer circular de NumPy reservado una sola vez
+# (tiempos float64 + valores int16), así la memoria queda acotada aunque la
+# sesión dure días. Toda trama SM0 que pase por el transporte se guarda; las
+# consultas las hace el poller, que sube SM0 a `rate` Hz mientras haya un
+# muestreador y las cuenta en su tope de comandos por segundo.
+
+SAMPLE_RATE = 20.0          # Hz
+CAPACITY = 20 * 60 * 15     # 15 minutos a 20 Hz
+PEAK_HOLD = 2.0             # s que se sostiene el pico
+
+
+class SMeterRing:
+    def __init__(self, capacity=CAPACITY):
+        self.capacity = capacity
+        self.times = np.zeros(capacity, dtype=np.float64)
+        self.values = np.zeros(capacity, dtype=np.int16)
+        self._head = 0      # siguiente posición a escribir
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._count
+
+    def append(self, t, value):
+        with self._lock:
+            self.times[self._head] = t
+            self.values[self._head] = value
+            self._head = (self._head + 1) % self.capacity
+            if self._count < self.capacity:
+                self._count += 1
+
+    def last_time(self):
+        with self._lock:
+            if not self._count:
+                return None
+            return self.times[self._head - 1]
+
+    def window(self, seconds=None, now=None):
+        # (tiempos, valores) en orden cronológico de los últimos `seconds` s
+        with self._lock:
+            if self._count < self.capacity:
+                times = self.times[:self._count].copy()
+                values = self.values[:self._count].copy()
+            else:
+                times = np.roll(self.times, -self._head)
+                values = np.roll(self.values, -self._head)
+        if seconds is not None and len(times):
+            now = time.time() if now is None else now
+            start = np.searchsorted(times, now - seconds)
+            times, values = times[start:], values[start:]
+        return times, values
+
+    def stats(self, seconds=60.0, peak_hold=PEAK_HOLD, now=None):
+        now = time.time() if now is None else now
+        times, values = self.window(seconds, now)
+        if not len(values):
+            return None
+        recent = values[times >= now - peak_hold]
+        return {
+            'n': int(len(values)),
+            'last': int(values[-1]),
+            'avg': float(values.mean()),
+            'min': int(values.min()),
+            'max': int(values.max()),
+            'peak': int(recent.max()) if len(recent) else int(values[-1]),
+        }
+
+
+class SMeterSampler:
+    # No manda nada por su cuenta: le pide al poller SM0 cada 1/rate s (entra
+    # al mismo presupuesto de comandos) y guarda cada trama SM0 que pasa
+    def __init__(self, poller, rate=SAMPLE_RATE, capacity=CAPACITY):
+        self.poller = poller
+        self.cat = poller.cat
+        self.rate = rate
+        self.ring = SMeterRing(capacity)
+        self._running = False
+
+    def on_smeter(self, level, frame):
+        if frame[2] == '0':
+            self.ring.append(time.time(), level)
+
+    def running(self):
+        return self._running
+
+    def start(self):
+        if self._running:
+            return
+        self.cat.add_handler('SM', self.on_smeter)
+        self.poller.request('SM0', 1.0 / self.rate)
+        self._running = True
+
+    def stop(self):
+        self.poller.release('SM0')
+        self.cat.remove_handler('SM', self.on_smeter)
+        self._running = False
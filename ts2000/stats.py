@@ -0,0 +1,142 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# ----------- INSTRUMENTACIÓN DEL TRANSPORTE Y DE LAS PÁGINAS -----------
+# Contadores baratos por comando (llamadas, '?;', timeouts, latencias),
+# bytes enviados/recibidos y un histograma de las últimas latencias, para ver
+# en la página de Diagnóstico si el retraso es del radio, del bus o de Streamlit.
+
+LATENCY_BUCKETS_MS = [5, 10, 20, 50, 100, 200, 500, 1000]
+HISTORY = 2000      # latencias recientes que alimentan el histograma
+RERUN_HISTORY = 200  # reejecuciones recientes por página
+
+
+class CommandStats:
+    __slots__ = ('count', 'errors', 'timeouts', 'answered', 'total', 'max')
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.answered = 0
+        self.total = 0.0
+        self.max = 0.0
+
+
+class CatStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.commands = {}
+            self.bytes_in = 0
+            self.bytes_out = 0
+            self.recent = deque(maxlen=HISTORY)
+            self.started = time.time()
+
+    def record(self, prefix, latency=None, error=False, timeout=False):
+        with self._lock:
+            stats = self.commands.get(prefix)
+            if stats is None:
+                stats = self.commands[prefix] = CommandStats()
+            stats.count += 1
+            if error:
+                stats.errors += 1
+            elif timeout:
+                stats.timeouts += 1
+            elif latency is not None:
+                stats.answered += 1
+                stats.total += latency
+                if latency > stats.max:
+                    stats.max = latency
+                self.recent.append(latency)
+
+    def summary(self):
+        # Una fila por comando, lista para st.dataframe
+        with self._lock:
+            items = sorted(self.commands.items())
+        return [
+            {
+                'Comando': prefix,
+                'Enviados': s.count,
+                'Respondidos': s.answered,
+                "'?;'": s.errors,
+                'Timeouts': s.timeouts,
+                'Prom. (ms)': round(s.total / s.answered * 1000, 1) if s.answered else None,
+                'Máx. (ms)': round(s.max * 1000, 1) if s.answered else None,
+            }
+            for prefix, s in items
+        ]
+
+    def histogram(self):
+        # [(etiqueta, cuenta)] de las últimas HISTORY latencias
+        with self._lock:
+            samples = list(self.recent)
+        counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        for latency in samples:
+            ms = latency * 1000
+            for i, limit in enumerate(LATENCY_BUCKETS_MS):
+                if ms < limit:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+        labels = [f"<{limit} ms" for limit in LATENCY_BUCKETS_MS] + [f"≥{LATENCY_BUCKETS_MS[-1]} ms"]
+        return list(zip(labels, counts))
+
+
+class RerunStats:
+    # Cuánto de cada reejecución de una página se va en E/S serie y cuánto en dibujar
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.pages = {}
+
+    def record(self, page, total, io):
+        with self._lock:
+            self.pages.setdefault(page, deque(maxlen=RERUN_HISTORY)).append((total, io))
+
+    def summary(self):
+        with self._lock:
+            items = {page: list(samples) for page, samples in self.pages.items()}
+        rows = []
+        for page, samples in sorted(items.items()):
+            n = len(samples)
+            total = sum(t for t, _ in samples) / n
+            io = sum(i for _, i in samples) / n
+            rows.append({
+                'Página': page,
+                'Reejecuciones': n,
+                'Total (ms)': round(total * 1000, 1),
+                'E/S serie (ms)': round(io * 1000, 1),
+                'Render (ms)': round((total - io) * 1000, 1),
+            })
+        return rows
+
+    def reset(self):
+        with self._lock:
+            self.pages.clear()
+
+
+RERUNS = RerunStats()
+
+
+class RerunTimer:
+    def __init__(self, page):
+        self.page = page
+        self.io_time = 0.0
+        self.start = time.perf_counter()
+
+    @contextmanager
+    def io(self):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.io_time += time.perf_counter() - t0
+
+    def finish(self):
+        RERUNS.record(self.page, time.perf_counter() - self.start, self.io_time)
@@ -0,0 +1,264 @@
+import glob
+import os
+import threading
+import time
+from dataclasses import replace
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from .poller import RigState
+
+# ----------- REGISTRO DE TELEMETRÍA EN PARQUET Y REPRODUCCIÓN -----------
+# Cada cambio del estado del poller (frecuencias, modos, VFO, TX, S-meter) se
+# guarda como un renglón con su marca de tiempo. El hilo del registrador
+# espera los cambios del poller por su cuenta y solo junta renglones en
+# memoria; el disco se toca cada FLUSH_ROWS renglones o FLUSH_SECONDS s, un
+# grupo de renglones (row group) por escritura, así el sondeo nunca espera
+# al disco. Cada SEGMENT_SECONDS se cierra el archivo y se abre otro: un
+# Parquet solo se puede leer cuando ya tiene su pie, y así se puede consultar
+# lo cerrado mientras se sigue grabando (lo del segmento abierto se consulta
+# desde memoria).
+#
+# ReplaySource reproduce un rango grabado con la misma interfaz que el poller
+# (snapshot / wait_for_change), de 1x a 100x.
+
+TELEMETRY_DIR = "telemetria"
+FLUSH_ROWS = 2000
+FLUSH_SECONDS = 10.0
+SEGMENT_SECONDS = 15 * 60
+
+SCHEMA = pa.schema([
+    ('t', pa.float64()),            # time.time()
+    ('vfo_a', pa.int64()),
+    ('vfo_b', pa.int64()),
+    ('mode_a', pa.string()),
+    ('mode_b', pa.string()),
+    ('active_vfo', pa.string()),
+    ('tx', pa.bool_()),
+    ('split', pa.bool_()),
+    ('smeter', pa.int16()),
+])
+COLUMNS = SCHEMA.names[1:]
+
+
+def state_row(rig):
+    return {'t': rig.updated or time.time(), **{k: getattr(rig, k) for k in COLUMNS}}
+
+
+class TelemetryRecorder:
+    def __init__(self, poller, directory=TELEMETRY_DIR, flush_rows=FLUSH_ROWS,
+                 flush_seconds=FLUSH_SECONDS, segment_seconds=SEGMENT_SECONDS):
+        self.poller = poller
+        self.directory = directory
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        self.segment_seconds = segment_seconds
+        self.rows_written = 0
+        self.row_groups = 0
+        self._pending = []          # renglones aún no escritos
+        self._segment = []          # tablas ya escritas en el segmento abierto
+        self._writer = None
+        self._segment_path = None
+        self._segment_started = 0.0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._flusher = None
+
+    # --- ciclo de vida ---
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running():
+            return self
+        os.makedirs(self.directory, exist_ok=True)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._collect, name="telemetry", daemon=True)
+        self._flusher = threading.Thread(target=self._flush_loop, name="telemetry-flush", daemon=True)
+        self._thread.start()
+        self._flusher.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        for thread in (self._thread, self._flusher):
+            if thread:
+                thread.join(timeout=2)
+        self.flush()
+        self._close_segment()
+
+    # --- captura ---
+    def _collect(self):
+        version = -1
+        while not self._stop.is_set():
+            new_version, rig = self.poller.wait_for_change(version, 1.0)
+            if new_version != version and rig.updated:
+                with self._lock:
+                    self._pending.append(state_row(rig))
+            version = new_version
+
+    def _flush_loop(self):
+        last = time.monotonic()
+        while not self._stop.wait(0.5):
+            with self._lock:
+                rows = len(self._pending)
+            if rows >= self.flush_rows or (rows and time.monotonic() - last >= self.flush_seconds):
+                self.flush()
+                last = time.monotonic()
+            if self._writer and time.time() - self._segment_started >= self.segment_seconds:
+                self._close_segment()
+
+    # --- disco ---
+    def flush(self):
+        with self._lock:
+            rows, self._pending = self._pending, []
+        if not rows:
+            return
+        table = pa.Table.from_pylist(rows, schema=SCHEMA)
+        if self._writer is None:
+            self._segment_started = time.time()
+            name = time.strftime("ts2000_%Y%m%d_%H%M%S", time.localtime(self._segment_started))
+            self._segment_path = os.path.join(self.directory, name + ".parquet")
+            # Se escribe con otro nombre hasta cerrarlo: así una consulta nunca
+            # abre un Parquet sin pie
+            self._writer = pq.ParquetWriter(self._segment_path + ".tmp", SCHEMA, compression='zstd')
+        self._writer.write_table(table)
+        with self._lock:
+            self._segment.append(table)
+        self.rows_written += len(rows)
+        self.row_groups += 1
+
+    def _close_segment(self):
+        if self._writer is None:
+            return
+        self._writer.close()
+        with self._lock:
+            # Renombrar y vaciar la memoria juntos: una consulta no ve los renglones dos veces
+            os.replace(self._segment_path + ".tmp", self._segment_path)
+            self._writer = None
+            self._segment = []
+
+    # --- consultas ---
+    def recent(self):
+        # Lo grabado que todavía no está en un archivo cerrado
+        with self._lock:
+            tables = list(self._segment)
+            if self._pending:
+                tables.append(pa.Table.from_pylist(self._pending, schema=SCHEMA))
+        return pa.concat_tables(tables) if tables else SCHEMA.empty_table()
+
+    def query(self, start=None, end=None, columns=None):
+        table = query_range(self.directory, start, end, columns)
+        live = _filter(self.recent(), start, end)
+        if columns:
+            live = live.select(_columns(columns))
+        return pa.concat_tables([table, live]) if live.num_rows else table
+
+
+def _filter(table, start, end):
+    mask = None
+    t = table.column('t')
+    if start is not None:
+        mask = pc.greater_equal(t, start)
+    if end is not None:
+        upper = pc.less(t, end)
+        mask = upper if mask is None else pc.and_(mask, upper)
+    return table if mask is None else table.filter(mask)
+
+
+def _columns(columns):
+    return None if not columns else ['t'] + [c for c in columns if c != 't']
+
+
+def segments(directory=TELEMETRY_DIR):
+    return sorted(glob.glob(os.path.join(directory, "ts2000_*.parquet")))
+
+
+def query_range(directory=TELEMETRY_DIR, start=None, end=None, columns=None):
+    # Renglones con start <= t < end de los segmentos cerrados, ordenados por t.
+    # El filtro usa las estadísticas de cada row group para no leer de más.
+    cols = _columns(columns)
+    files = segments(directory)
+    if not files:
+        empty = SCHEMA.empty_table()
+        return empty.select(cols) if cols else empty
+    dataset = ds.dataset(files, schema=SCHEMA, format="parquet")
+    expr = None
+    if start is not None:
+        expr = ds.field('t') >= start
+    if end is not None:
+        upper = ds.field('t') < end
+        expr = upper if expr is None else expr & upper
+    return dataset.to_table(columns=cols, filter=expr).sort_by('t')
+
+
+class ReplaySource:
+    # Reproduce una tabla de telemetría con la interfaz del poller
+    def __init__(self, table, speed=1.0):
+        self.rows = table.sort_by('t').to_pylist()
+        self.speed = speed
+        self.index = 0
+        self.version = 0
+        self.ai_active = False
+        self._state = RigState()
+        self._changed = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __len__(self):
+        return len(self.rows)
+
+    def snapshot(self):
+        with self._changed:
+            return self._state
+
+    def wait_for_change(self, version, timeout=None):
+        with self._changed:
+            self._changed.wait_for(lambda: self.version != version, timeout)
+            return self.version, self._state
+
+    def position(self):
+        # (t del renglón actual, fracción reproducida)
+        if not self.rows:
+            return None, 1.0
+        i = min(self.index, len(self.rows) - 1)
+        return self.rows[i]['t'], self.index / len(self.rows)
+
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="telemetry-replay", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+
+    def _apply(self, row):
+        fields = {k: row[k] for k in COLUMNS if row[k] is not None}
+        with self._changed:
+            self._state = replace(self._state, updated=time.time(), **fields)
+            self.version += 1
+            self._changed.notify_all()
+
+    def _run(self):
+        if not self.rows:
+            return
+        # El reloj de la grabación avanza `speed` veces más rápido que el real
+        t0, wall0 = self.rows[self.index]['t'], time.monotonic()
+        while self.index < len(self.rows) and not self._stop.is_set():
+            row = self.rows[self.index]
+            due = wall0 + (row['t'] - t0) / self.speed
+            delay = due - time.monotonic()
+            if delay > 0 and self._stop.wait(delay):
+                break
+            self._apply(row)
+            self.index += 1